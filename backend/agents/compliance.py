@@ -3,34 +3,153 @@ Compliance Agent - Manages document validation and regulatory compliance
 """
 
 import asyncio
+import functools
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 import re
 
+import orjson
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from langchain_openai import OpenAIEmbeddings
 
 from core.config import settings, AgentConfig
 from core.database import db_manager
+from core.llm_pool import get_llm
+from core.llm_cache import LLMCache, InMemoryLRU, SemanticLLMCache
 
 logger = logging.getLogger(__name__)
 
+# Score patterns in priority order (also used to detect a fully streamed score)
+_SCORE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'score[:\s]+(\d+)',
+        r'rating[:\s]+(\d+)',
+        r'(\d+)%',
+        r'(\d+)/100'
+    )
+]
+
+# All score patterns as one zero-width alternation so every start position is tried
+# in a single scan; the capturing group that fires identifies the pattern's rank
+_SCORE_SCAN = re.compile(
+    r'(?=score[:\s]+(\d+)|rating[:\s]+(\d+)|(\d+)%|(\d+)/100)',
+    re.IGNORECASE
+)
+
+# Non-empty lines, iterated lazily instead of materialising split('\n')
+_LINE_PATTERN = re.compile(r'[^\n]+')
+
+# Lines worth keeping from the elided middle of long documents
+_KEY_SECTION_PATTERN = re.compile(r'disclosure|signature|signed|purchase price|closing', re.IGNORECASE)
+
+# Single-pass keyword matchers used by the extractor helpers
+_ISSUE_KEYWORDS = re.compile(r'issue|problem|missing|required|violation', re.IGNORECASE)
+_CONTRACT_ISSUE_KEYWORDS = re.compile(r'critical|major|minor|issue', re.IGNORECASE)
+_ACTION_KEYWORDS = re.compile(r'action|recommend|should|must|need', re.IGNORECASE)
+
+# Audit indicators; the zero-width lookahead reports overlapping hits ("incomplete"
+# also counts as "complete"), matching the per-word str.count semantics
+_AUDIT_POSITIVE_INDICATORS = frozenset(['compliant', 'complete', 'proper', 'correct', 'valid'])
+_AUDIT_INDICATORS = re.compile(
+    r'(?=(compliant|complete|proper|correct|valid|missing|incomplete|violation|issue|problem))'
+)
+
+# Triage failure for documents with no text; deal audits turn it into an action item
+_MISSING_CONTENT_ERROR = "Missing required field: document.content"
+
+
+def _error_result(error: Any) -> Dict[str, Any]:
+    """Standard failure payload returned by compliance handlers"""
+    return {
+        "success": False,
+        "error": str(error),
+        "agent": "compliance"
+    }
+
+
+def _compliance_handler(label: str):
+    """Wrap a task handler so any exception is logged and returned as an error result"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(self, context: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                return await handler(self, context)
+            except Exception as e:
+                logger.error(f"{label} failed: {e}")
+                return _error_result(e)
+        return wrapper
+    return decorator
+
 
 class ComplianceAgent:
     """
     Compliance Agent that manages document validation and regulatory compliance
     """
     
+    # Task type -> handler method name; anything else is a general compliance task
+    _HANDLERS = {
+        "validate_document": "_validate_document",
+        "check_license": "_check_license_compliance",
+        "review_contract": "_review_contract",
+        "audit_deal": "_audit_deal_compliance",
+        "generate_report": "_generate_compliance_report",
+    }
+    
+    # Task types whose prompts can be built synchronously and sent through llm.abatch,
+    # mapped to their (message builder, response finalizer) method names
+    _BATCHABLE_TASKS = {
+        "validate_document": ("_build_validate_messages", "_finalize_document_validation"),
+        "check_license": ("_build_license_messages", "_finalize_license_check"),
+        "review_contract": ("_build_contract_messages", "_finalize_contract_review"),
+        "general_compliance": ("_build_general_messages", "_finalize_general_task"),
+    }
+    
+    # Upper bound on document validations in flight at once
+    MAX_CONCURRENT_VALIDATIONS = 10
+    
+    # Characters of streamed output re-scanned for an early-stop condition per chunk
+    STREAM_SCAN_WINDOW = 500
+    
+    # Document text longer than this is compacted before being embedded in a prompt
+    MAX_PROMPT_DOCUMENT_CHARS = 8000
+    
+    # Entity fields larger than this (in characters/bytes) are left out of prompts
+    MAX_PROMPT_FIELD_SIZE = 2048
+    
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.DEFAULT_LLM_MODEL,
-            temperature=AgentConfig.COMPLIANCE_AGENT["temperature"],
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.llm = get_llm(AgentConfig.COMPLIANCE_AGENT.temperature)
         self.config = AgentConfig.COMPLIANCE_AGENT
         self.is_initialized = False
         
+        # Settings are fixed for the process lifetime, so resolve hot-path lookups once
+        self._mock_mode = settings.is_mock_mode()
+        self._system_prompt = self.config.system_prompt
+        self._temperature = self.config.temperature
+        self._mock_license_payload = {
+            "valid": True,
+            "status": "active",
+            "expiration_date": "2024-12-31",
+            "license_type": "sales_associate",
+            "continuing_education": "current"
+        }
+        
+        # Identical prompts replay the earlier verdict instead of re-asking the LLM
+        self.cache = LLMCache(
+            InMemoryLRU(max_size=settings.LLM_CACHE_MAX_SIZE),
+            ttl=settings.LLM_CACHE_TTL
+        )
+        
+        # Second tier: near-duplicate documents (whitespace, single-field edits) by embedding similarity
+        self.semantic_cache = None
+        if settings.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticLLMCache(
+                OpenAIEmbeddings(model=settings.EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY),
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                max_size=settings.LLM_CACHE_MAX_SIZE
+            )
+        
         # Florida Real Estate Commission (FREC) compliance rules
         self.frec_rules = {
             "license_requirements": [
@@ -56,11 +175,18 @@ class ComplianceAgent:
                 "Fair housing compliance in all marketing"
             ]
         }
+        
+        # Caps concurrent document validations (see _audit_deal_compliance fan-out)
+        self._validation_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_VALIDATIONS)
+        
+        # Rules are fixed after construction, so render the prompt section once
+        self._formatted_rules_str = self._format_compliance_rules()
     
     async def initialize(self):
         """Initialize the compliance agent"""
         try:
             logger.info("Initializing Compliance Agent...")
+            
             self.is_initialized = True
             logger.info("Compliance Agent initialized successfully")
             
@@ -73,42 +199,152 @@ class ComplianceAgent:
         try:
             task_type = context.get("task_type", "general_compliance")
             
-            if task_type == "validate_document":
-                return await self._validate_document(context)
-            elif task_type == "check_license":
-                return await self._check_license_compliance(context)
-            elif task_type == "review_contract":
-                return await self._review_contract(context)
-            elif task_type == "audit_deal":
-                return await self._audit_deal_compliance(context)
-            elif task_type == "generate_report":
-                return await self._generate_compliance_report(context)
-            else:
-                return await self._general_compliance_task(context)
+            # Inputs whose outcome is already decided never reach the LLM
+            triaged = self._triage(context, task_type)
+            if triaged is not None:
+                return triaged
+            
+            handler = getattr(self, self._HANDLERS.get(task_type, "_general_compliance_task"))
+            return await handler(context)
                 
         except Exception as e:
             logger.error(f"Compliance agent execution failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "compliance"
-            }
+            return _error_result(e)
+    
+    async def batch_execute(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute several compliance contexts, batching their LLM calls into one round-trip"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(contexts)
+        batched = []
+        unbatched = []
+        
+        for index, context in enumerate(contexts):
+            task_type = context.get("task_type", "general_compliance")
+            handlers = self._BATCHABLE_TASKS.get(task_type)
+            
+            # A malformed context fails its own slot, never the whole batch
+            try:
+                triaged = self._triage(context, task_type)
+                if triaged is not None:
+                    results[index] = triaged
+                    continue
+                
+                if handlers is None:
+                    # Tasks needing async preparation (DB lookups) run through execute
+                    unbatched.append(index)
+                    continue
+                
+                build_method, finalize_method = handlers
+                messages = getattr(self, build_method)(context)
+            except Exception as e:
+                logger.error(f"Failed to prepare {task_type} batch task: {e}")
+                results[index] = _error_result(e)
+                continue
+            batched.append((index, finalize_method, messages))
+        
+        async def run_batch() -> List[Any]:
+            if not batched:
+                return []
+            return await self.llm.abatch(
+                [messages for _, _, messages in batched],
+                config={"max_concurrency": settings.LLM_MAX_CONCURRENCY},
+                return_exceptions=True
+            )
+        
+        responses, direct_results = await asyncio.gather(
+            run_batch(),
+            asyncio.gather(*(self.execute(contexts[index]) for index in unbatched))
+        )
+        
+        for index, result in zip(unbatched, direct_results):
+            results[index] = result
+        
+        async def finalize(index: int, finalize_method: str, response: Any):
+            if isinstance(response, Exception):
+                logger.error(f"Batched compliance task failed: {response}")
+                results[index] = _error_result(response)
+                return
+            try:
+                results[index] = await getattr(self, finalize_method)(contexts[index], response.content)
+            except Exception as e:
+                logger.error(f"Batched compliance task failed: {e}")
+                results[index] = _error_result(e)
+        
+        await asyncio.gather(*(
+            finalize(index, finalize_method, response)
+            for (index, finalize_method, _), response in zip(batched, responses)
+        ))
+        
+        return results
+    
+    def _triage(self, context: Dict[str, Any], task_type: str) -> Optional[Dict[str, Any]]:
+        """Return a canned result for inputs that can be decided without the LLM, else None"""
+        if task_type == "validate_document":
+            # Callers pass explicit nulls and non-string values; normalise before checking
+            document_info = context.get("document") or {}
+            if not str(document_info.get("content") or "").strip():
+                return _error_result(_MISSING_CONTENT_ERROR)
+        
+        elif task_type == "check_license":
+            agent_info = context.get("agent") or {}
+            license_number = agent_info.get("license_number")
+            if not str(license_number or "").strip():
+                return {
+                    "success": True,
+                    "agent_id": agent_info.get("id"),
+                    "license_number": license_number,
+                    "license_status": {
+                        "valid": False,
+                        "status": "inactive",
+                        "expiration_date": None,
+                        "license_type": None,
+                        "continuing_education": None
+                    },
+                    "compliance_assessment": "No license number provided",
+                    "compliant": False,
+                    "expiration_date": None,
+                    "agent": "compliance"
+                }
+        
+        elif task_type not in self._HANDLERS:
+            if not str(context.get("description") or "").strip():
+                return _error_result("Missing required field: description")
+        
+        return None
     
+    @_compliance_handler("Document validation")
     async def _validate_document(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Validate a real estate document for compliance"""
-        try:
-            document_info = context.get("document", {})
-            document_type = document_info.get("type", "")
-            document_content = document_info.get("content", "")
-            
-            # Create validation prompt
-            system_prompt = f"""You are a compliance agent specializing in Florida real estate regulations.
+        messages = self._build_validate_messages(context)
+        document_info = context.get("document", {})
+        
+        # Bounded so deal audits fanning out over many documents don't trip provider rate limits
+        async with self._validation_semaphore:
+            if context.get("score_only"):
+                # Callers that only need the score stop decoding once it has been emitted
+                response = await self._stream_llm(messages, stop_when=self._has_complete_score)
+            else:
+                response = await self._invoke_llm_semantic(
+                    messages,
+                    f"validate_document:{document_info.get('type', '')}",
+                    str(document_info.get("content") or "")
+                )
+        
+        return await self._finalize_document_validation(context, response.content)
+    
+    def _build_validate_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for document validation"""
+        document_info = context.get("document", {})
+        document_type = document_info.get("type", "")
+        document_content = str(document_info.get("content") or "")
+        
+        # Create validation prompt
+        system_prompt = f"""You are a compliance agent specializing in Florida real estate regulations.
 
 Document Type: {document_type}
-Document Content: {document_content}
+Document Content: {self._compact_for_prompt(document_content)}
 
 FREC Compliance Rules:
-{self._format_compliance_rules()}
+{self._formatted_rules_str}
 
 Validate this document for:
 1. Required fields and information
@@ -119,54 +355,57 @@ Validate this document for:
 
 Provide a detailed compliance assessment with specific issues and recommendations."""
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Validate {document_type} document for compliance")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # Extract compliance score and issues
-            compliance_score = self._extract_compliance_score(response.content)
-            issues = self._extract_compliance_issues(response.content)
-            
-            # Log compliance check
-            await self._log_compliance_check(
-                document_info.get("id", ""),
-                document_type,
-                compliance_score,
-                issues
-            )
-            
-            return {
-                "success": True,
-                "document_id": document_info.get("id"),
-                "document_type": document_type,
-                "compliance_score": compliance_score,
-                "validation_result": response.content,
-                "issues": issues,
-                "compliant": compliance_score >= 85,
-                "agent": "compliance"
-            }
-            
-        except Exception as e:
-            logger.error(f"Document validation failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "compliance"
-            }
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Validate {document_type} document for compliance")
+        ]
+    
+    async def _finalize_document_validation(self, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Turn a document validation response into the agent result"""
+        document_info = context.get("document", {})
+        document_type = document_info.get("type", "")
+        
+        # Extract compliance score and issues
+        compliance_score = self._extract_compliance_score(content)
+        issues = self._extract_compliance_issues(content)
+        
+        # Log compliance check
+        await self._log_compliance_check(
+            document_info.get("id", ""),
+            document_type,
+            compliance_score,
+            issues
+        )
+        
+        return {
+            "success": True,
+            "document_id": document_info.get("id"),
+            "document_type": document_type,
+            "compliance_score": compliance_score,
+            "validation_result": content,
+            "issues": issues,
+            "compliant": compliance_score >= 85,
+            "agent": "compliance"
+        }
     
+    @_compliance_handler("License compliance check")
     async def _check_license_compliance(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Check agent license compliance"""
-        try:
-            agent_info = context.get("agent", {})
-            license_number = agent_info.get("license_number", "")
-            
-            # Create license check prompt
-            system_prompt = f"""You are a compliance agent checking real estate license compliance.
+        messages = self._build_license_messages(context)
+        
+        response = await self._invoke_llm(messages)
+        
+        return await self._finalize_license_check(context, response.content)
+    
+    def _build_license_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for a license compliance check"""
+        agent_info = context.get("agent", {})
+        license_number = agent_info.get("license_number", "")
+        
+        # Create license check prompt
+        system_prompt = f"""You are a compliance agent checking real estate license compliance.
 
-Agent Information: {agent_info}
+Agent Information: {self._to_prompt_json(self._sanitize_for_prompt(agent_info))}
 License Number: {license_number}
 
 Check for:
@@ -178,45 +417,55 @@ Check for:
 
 Provide a comprehensive license compliance assessment."""
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Check license compliance for agent {agent_info.get('name', 'Unknown')}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # In production, this would integrate with FREC database
-            license_status = self._mock_license_check(license_number)
-            
-            return {
-                "success": True,
-                "agent_id": agent_info.get("id"),
-                "license_number": license_number,
-                "license_status": license_status,
-                "compliance_assessment": response.content,
-                "compliant": license_status.get("valid", False),
-                "expiration_date": license_status.get("expiration_date"),
-                "agent": "compliance"
-            }
-            
-        except Exception as e:
-            logger.error(f"License compliance check failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "compliance"
-            }
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Check license compliance for agent {agent_info.get('name', 'Unknown')}")
+        ]
+    
+    async def _finalize_license_check(self, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Turn a license check response into the agent result"""
+        agent_info = context.get("agent", {})
+        license_number = agent_info.get("license_number", "")
+        
+        # In production, this would integrate with FREC database
+        license_status = self._mock_license_check(license_number)
+        
+        return {
+            "success": True,
+            "agent_id": agent_info.get("id"),
+            "license_number": license_number,
+            "license_status": license_status,
+            "compliance_assessment": content,
+            "compliant": license_status.get("valid", False),
+            "expiration_date": license_status.get("expiration_date"),
+            "agent": "compliance"
+        }
     
+    @_compliance_handler("Contract review")
     async def _review_contract(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Review a real estate contract for compliance"""
-        try:
-            contract_info = context.get("contract", {})
-            contract_type = contract_info.get("type", "purchase_agreement")
-            
-            # Create contract review prompt
-            system_prompt = f"""You are a compliance agent reviewing a {contract_type}.
+        messages = self._build_contract_messages(context)
+        contract_info = context.get("contract", {})
+        
+        response = await self._invoke_llm_semantic(
+            messages,
+            f"review_contract:{contract_info.get('type', 'purchase_agreement')}",
+            str(contract_info)
+        )
+        
+        return await self._finalize_contract_review(context, response.content)
+    
+    def _build_contract_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for a contract review"""
+        contract_info = context.get("contract", {})
+        contract_type = contract_info.get("type", "purchase_agreement")
+        if isinstance(contract_info.get("content"), str):
+            contract_info = {**contract_info, "content": self._compact_for_prompt(contract_info["content"])}
+        
+        # Create contract review prompt
+        system_prompt = f"""You are a compliance agent reviewing a {contract_type}.
 
-Contract Information: {contract_info}
+Contract Information: {self._to_prompt_json(contract_info)}
 
 Review for FREC compliance including:
 1. Required contract elements
@@ -229,50 +478,45 @@ Review for FREC compliance including:
 
 Provide detailed review with specific compliance issues and recommendations."""
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Review {contract_type} for compliance")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # Extract contract issues
-            contract_issues = self._extract_contract_issues(response.content)
-            compliance_score = self._calculate_contract_score(contract_issues)
-            
-            return {
-                "success": True,
-                "contract_id": contract_info.get("id"),
-                "contract_type": contract_type,
-                "compliance_score": compliance_score,
-                "review_result": response.content,
-                "issues": contract_issues,
-                "approved": compliance_score >= 90,
-                "agent": "compliance"
-            }
-            
-        except Exception as e:
-            logger.error(f"Contract review failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "compliance"
-            }
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Review {contract_type} for compliance")
+        ]
     
+    async def _finalize_contract_review(self, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Turn a contract review response into the agent result"""
+        contract_info = context.get("contract", {})
+        contract_type = contract_info.get("type", "purchase_agreement")
+        
+        # Extract contract issues
+        contract_issues = self._extract_contract_issues(content)
+        compliance_score = self._calculate_contract_score(contract_issues)
+        
+        return {
+            "success": True,
+            "contract_id": contract_info.get("id"),
+            "contract_type": contract_type,
+            "compliance_score": compliance_score,
+            "review_result": content,
+            "issues": contract_issues,
+            "approved": compliance_score >= 90,
+            "agent": "compliance"
+        }
+    
+    @_compliance_handler("Deal audit")
     async def _audit_deal_compliance(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Audit a complete deal for compliance"""
-        try:
-            deal_info = context.get("deal", {})
-            deal_id = deal_info.get("id", "")
-            
-            # Get deal documents and information
-            deal_documents = await self._get_deal_documents(deal_id)
-            
-            # Create audit prompt
-            system_prompt = f"""You are a compliance agent conducting a comprehensive deal audit.
+        deal_info = context.get("deal", {})
+        deal_id = deal_info.get("id", "")
+        
+        # Get deal documents and information
+        deal_documents = await self._get_deal_documents(deal_id)
+        
+        # Create audit prompt
+        system_prompt = f"""You are a compliance agent conducting a comprehensive deal audit.
 
-Deal Information: {deal_info}
-Documents: {deal_documents}
+Deal Information: {self._to_prompt_json(self._sanitize_for_prompt(deal_info))}
+Documents: {self._to_prompt_json(deal_documents)}
 
 Conduct a full compliance audit covering:
 1. All required documents present
@@ -285,49 +529,61 @@ Conduct a full compliance audit covering:
 
 Provide a comprehensive audit report with compliance rating and action items."""
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Audit deal {deal_id} for full compliance")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # Calculate overall compliance rating
-            audit_score = self._calculate_audit_score(response.content)
-            action_items = self._extract_action_items(response.content)
-            
-            # Log audit results
-            await self._log_deal_audit(deal_id, audit_score, action_items)
-            
-            return {
-                "success": True,
-                "deal_id": deal_id,
-                "audit_score": audit_score,
-                "audit_report": response.content,
-                "action_items": action_items,
-                "compliant": audit_score >= 85,
-                "agent": "compliance"
-            }
-            
-        except Exception as e:
-            logger.error(f"Deal audit failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "compliance"
-            }
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Audit deal {deal_id} for full compliance")
+        ]
+        
+        # Validate each attached document while the deal-level audit runs
+        documents = [document for document in deal_documents if isinstance(document, dict)]
+        document_results, response = await asyncio.gather(
+            asyncio.gather(*(
+                self.execute({"task_type": "validate_document", "document": document})
+                for document in documents
+            )),
+            self._invoke_llm(messages)
+        )
+        
+        # Calculate overall compliance rating
+        audit_score = self._calculate_audit_score(response.content)
+        action_items = self._extract_action_items(response.content)
+        
+        for document, document_result in zip(documents, document_results):
+            document_label = document.get("type") or document.get("id") or "document"
+            if not document_result.get("success"):
+                # A document that couldn't be validated still needs someone to look at it
+                if document_result.get("error") == _MISSING_CONTENT_ERROR:
+                    action_items.append(f"{document_label}: missing content")
+                else:
+                    action_items.append(f"{document_label}: validation failed ({document_result.get('error')})")
+            elif not document_result.get("compliant"):
+                action_items.extend(f"{document_label}: {issue}" for issue in document_result.get("issues", []))
+        
+        # Log audit results
+        await self._log_deal_audit(deal_id, audit_score, action_items)
+        
+        return {
+            "success": True,
+            "deal_id": deal_id,
+            "audit_score": audit_score,
+            "audit_report": response.content,
+            "action_items": action_items,
+            "document_results": document_results,
+            "compliant": audit_score >= 85,
+            "agent": "compliance"
+        }
     
+    @_compliance_handler("Compliance report generation")
     async def _generate_compliance_report(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate compliance report for a time period"""
-        try:
-            report_period = context.get("period", "monthly")
-            company_id = context.get("company_id", "")
-            
-            # Get compliance data
-            compliance_data = await self._get_compliance_data(company_id, report_period)
-            
-            # Create report prompt
-            system_prompt = f"""You are a compliance agent generating a {report_period} compliance report.
+        report_period = context.get("period", "monthly")
+        company_id = context.get("company_id", "")
+        
+        # Get compliance data
+        compliance_data = await self._get_compliance_data(company_id, report_period)
+        
+        # Create report prompt
+        system_prompt = f"""You are a compliance agent generating a {report_period} compliance report.
 
 Compliance Data: {compliance_data}
 
@@ -341,68 +597,136 @@ Generate a comprehensive report including:
 
 Provide executive summary and detailed findings."""
 
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Generate {report_period} compliance report")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # Save report
-            report_id = await self._save_compliance_report(
-                company_id,
-                report_period,
-                response.content,
-                compliance_data
-            )
-            
-            return {
-                "success": True,
-                "report_id": report_id,
-                "report_period": report_period,
-                "report_content": response.content,
-                "metrics": compliance_data.get("metrics", {}),
-                "agent": "compliance"
-            }
-            
-        except Exception as e:
-            logger.error(f"Compliance report generation failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "compliance"
-            }
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Generate {report_period} compliance report")
+        ]
+        
+        response = await self._invoke_llm(messages)
+        
+        # Save report
+        report_id = await self._save_compliance_report(
+            company_id,
+            report_period,
+            response.content,
+            compliance_data
+        )
+        
+        return {
+            "success": True,
+            "report_id": report_id,
+            "report_period": report_period,
+            "report_content": response.content,
+            "metrics": compliance_data.get("metrics", {}),
+            "agent": "compliance"
+        }
     
+    @_compliance_handler("General compliance task")
     async def _general_compliance_task(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Handle general compliance tasks"""
-        try:
-            task_description = context.get("description", "")
-            
-            system_prompt = self.config["system_prompt"]
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Task: {task_description}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            return {
-                "success": True,
-                "response": response.content,
-                "agent": "compliance"
-            }
-            
-        except Exception as e:
-            logger.error(f"General compliance task failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "agent": "compliance"
-            }
+        messages = self._build_general_messages(context)
+        
+        response = await self._invoke_llm(messages)
+        
+        return await self._finalize_general_task(context, response.content)
+    
+    def _build_general_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for a general compliance task"""
+        task_description = context.get("description", "")
+        
+        system_prompt = self._system_prompt
+        
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Task: {task_description}")
+        ]
+    
+    async def _finalize_general_task(self, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Turn a general compliance response into the agent result"""
+        return {
+            "success": True,
+            "response": content,
+            "agent": "compliance"
+        }
     
     # Helper methods
     
+    async def _invoke_llm(self, messages: List[Any]) -> Any:
+        """Invoke the LLM, serving identical deterministic prompts from the response cache"""
+        key = LLMCache.cache_key(settings.DEFAULT_LLM_MODEL, self._temperature, messages)
+        return await self.cache.get_or_compute(key, lambda: self._stream_llm(messages))
+    
+    async def _stream_llm(self, messages: List[Any], stop_when: Optional[Callable[[str], bool]] = None) -> Any:
+        """Stream the LLM response, stopping early once stop_when accepts the latest output"""
+        response = None
+        stream = self.llm.astream(messages)
+        try:
+            async for chunk in stream:
+                response = chunk if response is None else response + chunk
+                # Only the tail needs re-checking; earlier text was already rejected
+                if stop_when is not None and stop_when(response.content[-self.STREAM_SCAN_WINDOW:]):
+                    break
+        finally:
+            await stream.aclose()
+        # Raising keeps an empty stream out of the response cache
+        if response is None:
+            raise ValueError("Compliance LLM returned an empty response")
+        return response
+    
+    async def _invoke_llm_semantic(self, messages: List[Any], namespace: str, content: str) -> Any:
+        """Invoke the LLM, reusing responses for near-duplicate content when semantic caching is on"""
+        if self.semantic_cache is None or not content:
+            return await self._invoke_llm(messages)
+        return await self.semantic_cache.get_or_compute(namespace, content, lambda: self._invoke_llm(messages))
+    
+    def _to_prompt_json(self, data: Any) -> str:
+        """Serialize data as compact JSON for prompt embedding"""
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def _compact_for_prompt(self, content: str, max_chars: Optional[int] = None) -> str:
+        """Shrink long document text to its head, tail and key sections for the prompt"""
+        max_chars = max_chars or self.MAX_PROMPT_DOCUMENT_CHARS
+        if len(content) <= max_chars:
+            return content
+        
+        # Three eighths each for head and tail, the remaining quarter for key sections
+        edge_chars = max_chars * 3 // 8
+        head = content[:edge_chars]
+        tail = content[-edge_chars:]
+        middle = content[edge_chars:-edge_chars]
+        
+        section_budget = max_chars - 2 * edge_chars
+        key_lines = []
+        for match in _LINE_PATTERN.finditer(middle):
+            line = match.group(0).strip()
+            if line and _KEY_SECTION_PATTERN.search(line):
+                if len(line) > section_budget:
+                    continue
+                key_lines.append(line)
+                section_budget -= len(line) + 1
+        
+        omitted = len(middle) - sum(len(line) for line in key_lines)
+        compacted = [head, f"\n...[truncated {omitted} chars]...\n"]
+        if key_lines:
+            compacted.append("\n".join(key_lines))
+            compacted.append("\n...\n")
+        compacted.append(tail)
+        return "".join(compacted)
+    
+    def _sanitize_for_prompt(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop oversized fields (photos, raw files) that only cost prompt tokens"""
+        sanitized = {}
+        for key, value in data.items():
+            if isinstance(value, (str, bytes)):
+                size = len(value)
+            elif isinstance(value, (dict, list)):
+                size = len(orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS))
+            else:
+                size = 0
+            if size <= self.MAX_PROMPT_FIELD_SIZE:
+                sanitized[key] = value
+        return sanitized
+    
     def _format_compliance_rules(self) -> str:
         """Format FREC compliance rules for prompt"""
         formatted_rules = []
@@ -413,27 +737,39 @@ Provide executive summary and detailed findings."""
             formatted_rules.append("")
         return "\n".join(formatted_rules)
     
+    def _has_complete_score(self, partial_text: str) -> bool:
+        """Check whether streamed text already contains a fully emitted score"""
+        for pattern in _SCORE_PATTERNS:
+            for match in pattern.finditer(partial_text):
+                # A trailing character proves the number is not still being streamed
+                if match.end() < len(partial_text):
+                    return True
+        return False
+    
     def _extract_compliance_score(self, assessment_text: str) -> int:
         """Extract compliance score from assessment text"""
-        # Look for score patterns
-        score_patterns = [
-            r'score[:\s]+(\d+)',
-            r'rating[:\s]+(\d+)',
-            r'(\d+)%',
-            r'(\d+)/100'
-        ]
+        # Look for score patterns in one pass; an earlier pattern outranks a later one
+        # wherever it appears, so keep the best-ranked first hit seen so far
+        score = None
+        best_rank = len(_SCORE_PATTERNS)
+        for match in _SCORE_SCAN.finditer(assessment_text):
+            rank = match.lastindex - 1
+            if rank < best_rank:
+                best_rank = rank
+                score = int(match.group(match.lastindex))
+                if rank == 0:
+                    break
         
-        for pattern in score_patterns:
-            match = re.search(pattern, assessment_text.lower())
-            if match:
-                return int(match.group(1))
+        if score is not None:
+            return score
         
         # Default scoring based on keywords
-        if "excellent" in assessment_text.lower() or "fully compliant" in assessment_text.lower():
+        assessment_lc = assessment_text.lower()
+        if "excellent" in assessment_lc or "fully compliant" in assessment_lc:
             return 95
-        elif "good" in assessment_text.lower() or "mostly compliant" in assessment_text.lower():
+        elif "good" in assessment_lc or "mostly compliant" in assessment_lc:
             return 85
-        elif "fair" in assessment_text.lower() or "partially compliant" in assessment_text.lower():
+        elif "fair" in assessment_lc or "partially compliant" in assessment_lc:
             return 70
         else:
             return 60
@@ -441,28 +777,31 @@ Provide executive summary and detailed findings."""
     def _extract_compliance_issues(self, assessment_text: str) -> List[str]:
         """Extract compliance issues from assessment text"""
         issues = []
-        lines = assessment_text.split('\n')
+        lines = (match.group(0) for match in _LINE_PATTERN.finditer(assessment_text))
         
         for line in lines:
             line = line.strip()
-            if any(keyword in line.lower() for keyword in ['issue', 'problem', 'missing', 'required', 'violation']):
+            if _ISSUE_KEYWORDS.search(line):
                 if line and not line.startswith('#'):
                     issues.append(line)
+                    if len(issues) == 10:
+                        break
         
         return issues[:10]  # Limit to top 10 issues
     
     def _extract_contract_issues(self, review_text: str) -> List[Dict[str, Any]]:
         """Extract contract issues with severity"""
         issues = []
-        lines = review_text.split('\n')
+        lines = (match.group(0) for match in _LINE_PATTERN.finditer(review_text))
         
         for line in lines:
             line = line.strip()
-            if any(keyword in line.lower() for keyword in ['critical', 'major', 'minor', 'issue']):
+            if _CONTRACT_ISSUE_KEYWORDS.search(line):
+                line_lc = line.lower()
                 severity = "minor"
-                if "critical" in line.lower():
+                if "critical" in line_lc:
                     severity = "critical"
-                elif "major" in line.lower():
+                elif "major" in line_lc:
                     severity = "major"
                 
                 issues.append({
@@ -470,6 +809,8 @@ Provide executive summary and detailed findings."""
                     "severity": severity,
                     "category": "contract_compliance"
                 })
+                if len(issues) == 15:
+                    break
         
         return issues[:15]
     
@@ -489,12 +830,15 @@ Provide executive summary and detailed findings."""
     
     def _calculate_audit_score(self, audit_text: str) -> int:
         """Calculate overall audit score"""
-        # Count positive and negative indicators
-        positive_indicators = ['compliant', 'complete', 'proper', 'correct', 'valid']
-        negative_indicators = ['missing', 'incomplete', 'violation', 'issue', 'problem']
+        # Count positive and negative indicators in a single scan
+        positive_count = 0
+        negative_count = 0
         
-        positive_count = sum(audit_text.lower().count(word) for word in positive_indicators)
-        negative_count = sum(audit_text.lower().count(word) for word in negative_indicators)
+        for match in _AUDIT_INDICATORS.finditer(audit_text.lower()):
+            if match.group(1) in _AUDIT_POSITIVE_INDICATORS:
+                positive_count += 1
+            else:
+                negative_count += 1
         
         if positive_count + negative_count == 0:
             return 75  # Default score
@@ -505,26 +849,22 @@ Provide executive summary and detailed findings."""
     def _extract_action_items(self, audit_text: str) -> List[str]:
         """Extract action items from audit text"""
         action_items = []
-        lines = audit_text.split('\n')
+        lines = (match.group(0) for match in _LINE_PATTERN.finditer(audit_text))
         
         for line in lines:
             line = line.strip()
-            if any(keyword in line.lower() for keyword in ['action', 'recommend', 'should', 'must', 'need']):
+            if _ACTION_KEYWORDS.search(line):
                 if line and len(line) > 10:
                     action_items.append(line)
+                    if len(action_items) == 10:
+                        break
         
         return action_items[:10]
     
     def _mock_license_check(self, license_number: str) -> Dict[str, Any]:
         """Mock license check for demo purposes"""
-        if settings.is_mock_mode():
-            return {
-                "valid": True,
-                "status": "active",
-                "expiration_date": "2024-12-31",
-                "license_type": "sales_associate",
-                "continuing_education": "current"
-            }
+        if self._mock_mode:
+            return dict(self._mock_license_payload)
         
         # In production, this would query FREC database
         return {
@@ -538,7 +878,7 @@ Provide executive summary and detailed findings."""
     async def _get_deal_documents(self, deal_id: str) -> List[Dict[str, Any]]:
         """Get all documents for a deal"""
         try:
-            deal = await db_manager.get_record("deals", deal_id)
+            deal = await db_manager.get_record("deals", deal_id, columns="documents")
             if deal:
                 return deal.get("documents", [])
             return []
@@ -571,51 +911,46 @@ Provide executive summary and detailed findings."""
     
     async def _log_compliance_check(self, document_id: str, document_type: str, score: int, issues: List[str]):
         """Log compliance check results"""
-        try:
-            await db_manager.log_audit_event(
-                "document",
-                document_id,
-                "compliance_check",
-                old_values=None,
-                new_values={
-                    "compliance_score": score,
-                    "issues": issues,
-                    "document_type": document_type
-                }
-            )
-        except Exception as e:
-            logger.error(f"Failed to log compliance check: {e}")
+        # db_manager batches audit writes behind the request
+        await db_manager.log_audit_event(
+            "document",
+            document_id,
+            "compliance_check",
+            new_values={
+                "compliance_score": score,
+                "issues": issues,
+                "document_type": document_type
+            }
+        )
     
     async def _log_deal_audit(self, deal_id: str, audit_score: int, action_items: List[str]):
         """Log deal audit results"""
-        try:
-            await db_manager.log_audit_event(
-                "deal",
-                deal_id,
-                "compliance_audit",
-                old_values=None,
-                new_values={
-                    "audit_score": audit_score,
-                    "action_items": action_items
-                }
-            )
-        except Exception as e:
-            logger.error(f"Failed to log deal audit: {e}")
+        await db_manager.log_audit_event(
+            "deal",
+            deal_id,
+            "compliance_audit",
+            new_values={
+                "audit_score": audit_score,
+                "action_items": action_items
+            }
+        )
     
     async def _save_compliance_report(self, company_id: str, period: str, content: str, data: Dict[str, Any]) -> str:
         """Save compliance report"""
         try:
+            # One clock read so the report ID and generated_at always agree
+            generated_at = datetime.now()
             report_data = {
                 "company_id": company_id,
                 "report_type": "compliance",
                 "period": period,
                 "content": content,
                 "data": data,
-                "generated_at": datetime.now().isoformat()
+                "generated_at": generated_at.isoformat()
             }
             
             # This would save to a reports table
-            report_id = f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            report_id = f"compliance_report_{generated_at:%Y%m%d_%H%M%S}"
             logger.info(f"Saved compliance report: {report_id}")
             return report_id
             
@@ -626,11 +961,13 @@ Provide executive summary and detailed findings."""
     async def get_status(self) -> Dict[str, Any]:
         """Get agent status"""
         return {
-            "name": self.config["name"],
+            "name": self.config.name,
             "status": "healthy" if self.is_initialized else "initializing",
             "initialized": self.is_initialized,
             "compliance_rules": len(self.frec_rules),
-            "mock_mode": settings.is_mock_mode()
+            "llm_cache": self.cache.get_stats(),
+            "semantic_cache": self.semantic_cache.get_stats() if self.semantic_cache else None,
+            "mock_mode": self._mock_mode
         }
     
     async def shutdown(self):
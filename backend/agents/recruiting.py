@@ -4,55 +4,189 @@ Recruiting Agent - Handles candidate sourcing, qualification, and engagement
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import re
+from typing import Dict, Any, List, Optional, Literal
 
+import orjson
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from langchain_openai import OpenAIEmbeddings
 from langchain_core.tools import tool
+# with_structured_output in the pinned langchain-core builds tool schemas and parses results with pydantic v1 models
+from langchain_core.pydantic_v1 import BaseModel, Field
 
 from core.config import settings, AgentConfig
 from core.database import db_manager
+from core.llm_pool import get_llm
+from core.llm_cache import LLMCache, InMemoryLRU, SemanticLLMCache
+from core.write_buffer import WriteBuffer
 from integrations.zoho import ZohoIntegration
 from integrations.google import GoogleIntegration
 
 logger = logging.getLogger(__name__)
 
+# Marks an optional argument the caller did not pass (None is a meaningful value)
+_UNSET = object()
+
+# Lines mentioning a recommendation keyword, matched case-insensitively in one scan
+_RECOMMENDATION_LINE = re.compile(r'^.*(?:recommend|suggest|should|action).*$', re.IGNORECASE | re.MULTILINE)
+
+# Demo candidates returned by mock-mode sourcing; built once and shared read-only
+_MOCK_CANDIDATES = (
+    {
+        "id": "mock_candidate_1",
+        "name": "Sarah Johnson",
+        "email": "sarah.johnson@email.com",
+        "phone": "(555) 123-4567",
+        "experience_years": 5,
+        "current_company": "ABC Realty",
+        "status": "active",
+        "source": "LinkedIn"
+    },
+    {
+        "id": "mock_candidate_2",
+        "name": "Mike Chen",
+        "email": "mike.chen@email.com",
+        "phone": "(555) 234-5678",
+        "experience_years": 3,
+        "current_company": "XYZ Properties",
+        "status": "passive",
+        "source": "Referral"
+    }
+)
+
+
+class QualificationSchema(BaseModel):
+    """Structured candidate evaluation returned by the LLM"""
+    score: int = Field(ge=0, le=100, description="Overall qualification score")
+    recommendation: Literal["hire", "interview", "reject"]
+    reasoning: str = Field(description="Evaluation of experience, skills match, fit and red flags")
+    recommendations: List[str] = Field(default_factory=list, description="Actionable next steps")
+
+
+# Task system prompts carry no per-request data so the provider can cache the shared
+# prefix; the variable inputs travel as JSON in the HumanMessage instead
+SOURCE_CANDIDATES_SYSTEM_PROMPT = """You are a recruiting agent tasked with sourcing real estate agent candidates.
+
+The user message contains the job requirements, location and experience level as JSON.
+
+Your task is to:
+1. Analyze the job requirements
+2. Identify key qualifications and skills needed
+3. Suggest sourcing strategies and channels
+4. Create candidate search criteria
+5. Recommend outreach messaging
+
+Provide a structured response with actionable sourcing recommendations."""
+
+QUALIFY_CANDIDATE_SYSTEM_PROMPT = """You are a recruiting agent evaluating a candidate for a real estate agent position.
+
+The user message contains the candidate information and job requirements as JSON.
+
+Evaluate the candidate on:
+1. Experience and qualifications
+2. Skills match with requirements
+3. Cultural fit indicators
+4. Potential red flags
+5. Overall recommendation (hire/interview/reject)
+
+Return a qualification score from 0 to 100, your overall recommendation, your reasoning,
+and a short list of actionable next steps."""
+
+SCHEDULE_INTERVIEW_SYSTEM_PROMPT = """You are a recruiting agent scheduling an interview.
+
+The user message contains the candidate, candidate email, interviewer and preferred times as JSON.
+
+Create a professional interview invitation email and suggest optimal scheduling."""
+
+FOLLOW_UP_SYSTEM_PROMPT = """You are a recruiting agent following up with a candidate.
+
+The user message contains the candidate, follow-up type and last interaction as JSON.
+
+Create a personalized, professional follow-up message that:
+1. References the last interaction
+2. Provides relevant updates
+3. Includes clear next steps
+4. Maintains engagement"""
+
+UPDATE_PIPELINE_SYSTEM_PROMPT = """You are a recruiting agent analyzing the current pipeline.
+
+The user message contains the current pipeline data as JSON.
+
+Analyze and provide:
+1. Pipeline health assessment
+2. Bottleneck identification
+3. Conversion rate analysis
+4. Recommendations for improvement
+5. Action items for next steps"""
+
 
 class RecruitingAgent:
     """
     Recruiting Agent that handles candidate sourcing, qualification, and engagement
     """
     
+    # Task types whose prompts can be built synchronously and sent through llm.abatch,
+    # mapped to their (message builder, response finalizer) method names
+    _BATCHABLE_TASKS = {
+        "source_candidates": ("_build_source_messages", "_finalize_source_candidates"),
+        "schedule_interview": ("_build_interview_messages", "_finalize_interview"),
+        "follow_up": ("_build_follow_up_messages", "_finalize_follow_up"),
+        "general_recruiting": ("_build_general_messages", "_finalize_general_task"),
+    }
+    
+    # Candidates listed under recent_activity in the pipeline analysis prompt
+    RECENT_ACTIVITY_LIMIT = 10
+    RECENT_ACTIVITY_COLUMNS = "id, first_name, last_name, status, source, updated_at"
+    
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.DEFAULT_LLM_MODEL,
-            temperature=AgentConfig.RECRUITING_AGENT["temperature"],
-            api_key=settings.OPENAI_API_KEY
+        self.llm = get_llm(
+            AgentConfig.RECRUITING_AGENT.temperature,
+            latency_optimized=AgentConfig.RECRUITING_AGENT.latency_optimized
         )
         self.config = AgentConfig.RECRUITING_AGENT
-        self.zoho = None
-        self.google = None
+        self._general_system_prompt = self.config.system_prompt
+        
+        # Structured-output runnables, keyed by response schema and built on first use
+        self._structured_llms: Dict[type, Any] = {}
+        # Integrations connect on first use; the locks keep concurrent first calls
+        # from initializing the same integration twice
+        self.zoho: Optional[ZohoIntegration] = None
+        self.google: Optional[GoogleIntegration] = None
+        self._zoho_lock = asyncio.Lock()
+        self._google_lock = asyncio.Lock()
         self.is_initialized = False
+        
+        # Candidate status updates are written behind the request in multi-row batches
+        self.candidate_updates = WriteBuffer(db_manager.bulk_update_candidate_status, "candidate status")
+        
+        # Repeated sourcing/qualification requests with identical inputs reuse the earlier response
+        self.cache = LLMCache(
+            InMemoryLRU(max_size=settings.LLM_CACHE_MAX_SIZE),
+            ttl=settings.LLM_CACHE_TTL
+        )
+        
+        # Second tier: paraphrased job requirements / candidate details by embedding similarity
+        self.semantic_cache = None
+        if settings.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticLLMCache(
+                OpenAIEmbeddings(model=settings.EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY),
+                threshold=settings.RECRUITING_SEMANTIC_CACHE_THRESHOLD,
+                max_size=settings.LLM_CACHE_MAX_SIZE
+            )
     
     async def initialize(self):
         """Initialize the recruiting agent and its integrations"""
         try:
             logger.info("Initializing Recruiting Agent...")
             
-            # Initialize integrations
-            if not settings.is_mock_mode():
-                self.zoho = ZohoIntegration()
-                await self.zoho.initialize()
-                
-                self.google = GoogleIntegration()
-                await self.google.initialize()
+            # Zoho and Google are initialized lazily by _get_zoho / _get_google
+            self.candidate_updates.start()
             
             self.is_initialized = True
             logger.info("Recruiting Agent initialized successfully")
             
         except Exception as e:
-            logger.error(f"Failed to initialize Recruiting Agent: {e}")
+            logger.error("Failed to initialize Recruiting Agent: %s", e)
             raise
     
     async def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -74,272 +208,362 @@ class RecruitingAgent:
                 return await self._general_recruiting_task(context)
                 
         except Exception as e:
-            logger.error(f"Recruiting agent execution failed: {e}")
+            logger.error("Recruiting agent execution failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "agent": "recruiting"
             }
     
+    async def batch_execute(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute several recruiting contexts, overlapping their LLM calls"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(contexts)
+        batched = []
+        unbatched = []
+        
+        for index, context in enumerate(contexts):
+            task_type = context.get("task_type", "general_recruiting")
+            handlers = self._BATCHABLE_TASKS.get(task_type)
+            if handlers is None:
+                # Pipeline updates (DB read before prompting) and structured-output
+                # qualification run through execute, concurrently with the batch
+                unbatched.append(index)
+                continue
+            
+            build_method, finalize_method = handlers
+            try:
+                messages = getattr(self, build_method)(context)
+            except Exception as e:
+                logger.error("Failed to build %s batch messages: %s", task_type, e)
+                results[index] = {"success": False, "error": str(e), "agent": "recruiting"}
+                continue
+            batched.append((index, finalize_method, messages))
+        
+        async def run_batch() -> List[Any]:
+            if not batched:
+                return []
+            return await self.llm.abatch(
+                [messages for _, _, messages in batched],
+                config={"max_concurrency": settings.LLM_MAX_CONCURRENCY},
+                return_exceptions=True
+            )
+        
+        responses, direct_results = await asyncio.gather(
+            run_batch(),
+            asyncio.gather(*(self.execute(contexts[index]) for index in unbatched))
+        )
+        
+        for index, result in zip(unbatched, direct_results):
+            results[index] = result
+        
+        async def finalize(index: int, finalize_method: str, response: Any):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                results[index] = await getattr(self, finalize_method)(contexts[index], response.content)
+            except Exception as e:
+                logger.error("Batched recruiting task failed: %s", e)
+                results[index] = {"success": False, "error": str(e), "agent": "recruiting"}
+        
+        # Side effects (CRM search, DB updates, emails) also overlap across contexts
+        await asyncio.gather(*(
+            finalize(index, finalize_method, response)
+            for (index, finalize_method, _), response in zip(batched, responses)
+        ))
+        
+        return results
+    
     async def _source_candidates(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Source candidates based on job requirements"""
         try:
-            job_requirements = context.get("job_requirements", {})
-            location = context.get("location", "")
-            experience_level = context.get("experience_level", "")
-            
-            # Create sourcing prompt
-            system_prompt = f"""You are a recruiting agent tasked with sourcing real estate agent candidates.
-            
-Job Requirements: {job_requirements}
-Location: {location}
-Experience Level: {experience_level}
-
-Your task is to:
-1. Analyze the job requirements
-2. Identify key qualifications and skills needed
-3. Suggest sourcing strategies and channels
-4. Create candidate search criteria
-5. Recommend outreach messaging
-
-Provide a structured response with actionable sourcing recommendations."""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Source candidates for: {job_requirements}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # If not in mock mode, actually search for candidates
-            candidates = []
-            if not settings.is_mock_mode() and self.zoho:
-                candidates = await self._search_candidates_in_crm(job_requirements)
-            else:
-                # Mock candidates for demo
-                candidates = self._generate_mock_candidates()
+            messages = self._build_source_messages(context)
+            
+            # Paraphrased job specs reuse an earlier sourcing strategy; the CRM search
+            # doesn't depend on the strategy, so it runs alongside the LLM call
+            response, candidates = await asyncio.gather(
+                self._invoke_llm_semantic(
+                    messages,
+                    "source_candidates",
+                    self._to_prompt_json({
+                        "job_requirements": context.get("job_requirements", {}),
+                        "location": context.get("location", ""),
+                        "experience_level": context.get("experience_level", "")
+                    })
+                ),
+                self._find_candidates(context.get("job_requirements", {}))
+            )
             
-            return {
-                "success": True,
-                "sourcing_strategy": response.content,
-                "candidates_found": len(candidates),
-                "candidates": candidates,
-                "recommendations": self._extract_recommendations(response.content),
-                "agent": "recruiting"
-            }
+            return await self._finalize_source_candidates(context, response.content, candidates)
             
         except Exception as e:
-            logger.error(f"Candidate sourcing failed: {e}")
+            logger.error("Candidate sourcing failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "agent": "recruiting"
             }
     
+    def _build_source_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for candidate sourcing"""
+        job_requirements = context.get("job_requirements", {})
+        location = context.get("location", "")
+        experience_level = context.get("experience_level", "")
+        
+        return [
+            SystemMessage(content=SOURCE_CANDIDATES_SYSTEM_PROMPT),
+            HumanMessage(content="Source candidates for:\n" + self._to_prompt_json({
+                "job_requirements": job_requirements,
+                "location": location,
+                "experience_level": experience_level
+            }))
+        ]
+    
+    async def _find_candidates(self, job_requirements: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Search the CRM for matching candidates (mock candidates in mock mode)"""
+        # If not in mock mode, actually search for candidates
+        if await self._get_zoho():
+            return await self._search_candidates_in_crm(job_requirements)
+        
+        # Mock candidates for demo
+        return self._generate_mock_candidates()
+    
+    async def _finalize_source_candidates(self, context: Dict[str, Any], content: str, candidates: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Turn a sourcing strategy response into the agent result"""
+        if candidates is None:
+            candidates = await self._find_candidates(context.get("job_requirements", {}))
+        
+        return {
+            "success": True,
+            "sourcing_strategy": content,
+            "candidates_found": len(candidates),
+            "candidates": candidates,
+            "recommendations": self._extract_recommendations(content),
+            "agent": "recruiting"
+        }
+    
     async def _qualify_candidate(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Qualify a candidate based on requirements"""
         try:
+            messages = self._build_qualify_messages(context)
             candidate_info = context.get("candidate", {})
-            job_requirements = context.get("job_requirements", {})
-            
-            # Create qualification prompt
-            system_prompt = f"""You are a recruiting agent evaluating a candidate for a real estate agent position.
-
-Candidate Information: {candidate_info}
-Job Requirements: {job_requirements}
-
-Evaluate the candidate on:
-1. Experience and qualifications
-2. Skills match with requirements
-3. Cultural fit indicators
-4. Potential red flags
-5. Overall recommendation (Hire/No Hire/Interview)
-
-Provide a structured evaluation with scores and reasoning."""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Evaluate candidate: {candidate_info.get('name', 'Unknown')}")
-            ]
             
-            response = await self.llm.ainvoke(messages)
-            
-            # Extract qualification score
-            qualification_score = self._extract_qualification_score(response.content)
-            
-            # Update candidate in database
-            if candidate_info.get("id"):
-                await self._update_candidate_status(
-                    candidate_info["id"],
-                    "qualified" if qualification_score >= 70 else "not_qualified",
-                    response.content
-                )
+            # Scoped per candidate so similar-looking profiles never share an evaluation
+            candidate_key = candidate_info.get("id") or candidate_info.get("email") or candidate_info.get("name", "")
+            response = await self._invoke_llm_semantic(
+                messages,
+                f"qualify_candidate:{candidate_key}",
+                self._to_prompt_json({
+                    "candidate": candidate_info,
+                    "job_requirements": context.get("job_requirements", {})
+                }),
+                schema=QualificationSchema
+            )
             
-            return {
-                "success": True,
-                "candidate_id": candidate_info.get("id"),
-                "qualification_score": qualification_score,
-                "evaluation": response.content,
-                "recommendation": "proceed" if qualification_score >= 70 else "reject",
-                "agent": "recruiting"
-            }
+            return await self._finalize_qualification(context, response)
             
         except Exception as e:
-            logger.error(f"Candidate qualification failed: {e}")
+            logger.error("Candidate qualification failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "agent": "recruiting"
             }
     
+    def _build_qualify_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for candidate qualification"""
+        candidate_info = context.get("candidate", {})
+        job_requirements = context.get("job_requirements", {})
+        
+        return [
+            SystemMessage(content=QUALIFY_CANDIDATE_SYSTEM_PROMPT),
+            HumanMessage(content=f"Evaluate candidate: {candidate_info.get('name', 'Unknown')}\n" + self._to_prompt_json({
+                "candidate": candidate_info,
+                "job_requirements": job_requirements
+            }))
+        ]
+    
+    async def _finalize_qualification(self, context: Dict[str, Any], evaluation: "QualificationSchema") -> Dict[str, Any]:
+        """Turn a structured candidate evaluation into the agent result"""
+        candidate_info = context.get("candidate", {})
+        qualification_score = evaluation.score
+        
+        # Update candidate in database
+        if candidate_info.get("id"):
+            await self._update_candidate_status(
+                candidate_info["id"],
+                "qualified" if qualification_score >= 70 else "not_qualified",
+                evaluation.reasoning
+            )
+        
+        return {
+            "success": True,
+            "candidate_id": candidate_info.get("id"),
+            "qualification_score": qualification_score,
+            "evaluation": evaluation.reasoning,
+            "recommendation": "proceed" if qualification_score >= 70 else "reject",
+            "hiring_recommendation": evaluation.recommendation,
+            "recommendations": evaluation.recommendations,
+            "agent": "recruiting"
+        }
+    
     async def _schedule_interview(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Schedule an interview with a candidate"""
         try:
-            candidate_info = context.get("candidate", {})
-            interviewer_email = context.get("interviewer_email", "")
-            preferred_times = context.get("preferred_times", [])
-            
-            # Create scheduling prompt
-            system_prompt = f"""You are a recruiting agent scheduling an interview.
-
-Candidate: {candidate_info.get('name', 'Unknown')}
-Candidate Email: {candidate_info.get('email', '')}
-Interviewer: {interviewer_email}
-Preferred Times: {preferred_times}
-
-Create a professional interview invitation email and suggest optimal scheduling."""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content="Create interview scheduling communication")
-            ]
+            messages = self._build_interview_messages(context)
             
-            response = await self.llm.ainvoke(messages)
-            
-            # If not in mock mode, actually schedule the interview
-            calendar_event = None
-            if not settings.is_mock_mode() and self.google:
-                calendar_event = await self._create_calendar_event(
-                    candidate_info,
-                    interviewer_email,
-                    preferred_times[0] if preferred_times else None
-                )
-            else:
-                # Mock calendar event
-                calendar_event = {
-                    "id": "mock_event_123",
-                    "title": f"Interview with {candidate_info.get('name', 'Candidate')}",
-                    "start_time": preferred_times[0] if preferred_times else "2024-01-15T10:00:00Z",
-                    "meeting_link": "https://meet.google.com/mock-meeting-link"
-                }
-            
-            # Send invitation email
-            email_sent = await self._send_interview_invitation(
-                candidate_info.get("email", ""),
-                response.content,
-                calendar_event
-            )
+            # The calendar event only needs the candidate, interviewer and time slot,
+            # so book it while the invitation text is still being generated
+            calendar_task = asyncio.create_task(self._book_interview_slot(context))
+            try:
+                response = await self._invoke_llm(messages)
+            except BaseException:
+                calendar_task.cancel()
+                raise
             
-            return {
-                "success": True,
-                "candidate_id": candidate_info.get("id"),
-                "calendar_event": calendar_event,
-                "email_sent": email_sent,
-                "invitation_content": response.content,
-                "agent": "recruiting"
-            }
+            return await self._finalize_interview(context, response.content, await calendar_task)
             
         except Exception as e:
-            logger.error(f"Interview scheduling failed: {e}")
+            logger.error("Interview scheduling failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "agent": "recruiting"
             }
     
+    def _build_interview_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for interview scheduling"""
+        candidate_info = context.get("candidate", {})
+        interviewer_email = context.get("interviewer_email", "")
+        preferred_times = context.get("preferred_times", [])
+        
+        return [
+            SystemMessage(content=SCHEDULE_INTERVIEW_SYSTEM_PROMPT),
+            HumanMessage(content="Create interview scheduling communication:\n" + self._to_prompt_json({
+                "candidate": candidate_info.get("name", "Unknown"),
+                "candidate_email": candidate_info.get("email", ""),
+                "interviewer": interviewer_email,
+                "preferred_times": preferred_times
+            }))
+        ]
+    
+    async def _book_interview_slot(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create the calendar event for an interview (mock event in mock mode)"""
+        candidate_info = context.get("candidate", {})
+        interviewer_email = context.get("interviewer_email", "")
+        preferred_times = context.get("preferred_times", [])
+        
+        # If not in mock mode, actually schedule the interview
+        if await self._get_google():
+            return await self._create_calendar_event(
+                candidate_info,
+                interviewer_email,
+                preferred_times[0] if preferred_times else None
+            )
+        
+        # Mock calendar event
+        return {
+            "id": "mock_event_123",
+            "title": f"Interview with {candidate_info.get('name', 'Candidate')}",
+            "start_time": preferred_times[0] if preferred_times else "2024-01-15T10:00:00Z",
+            "meeting_link": "https://meet.google.com/mock-meeting-link"
+        }
+    
+    async def _finalize_interview(self, context: Dict[str, Any], content: str, calendar_event: Any = _UNSET) -> Dict[str, Any]:
+        """Send the invitation drafted by the LLM, booking the calendar event if not already done"""
+        candidate_info = context.get("candidate", {})
+        
+        if calendar_event is _UNSET:
+            calendar_event = await self._book_interview_slot(context)
+        
+        # Send invitation email
+        email_sent = await self._send_interview_invitation(
+            candidate_info.get("email", ""),
+            content,
+            calendar_event
+        )
+        
+        return {
+            "success": True,
+            "candidate_id": candidate_info.get("id"),
+            "calendar_event": calendar_event,
+            "email_sent": email_sent,
+            "invitation_content": content,
+            "agent": "recruiting"
+        }
+    
     async def _follow_up_candidate(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Follow up with a candidate"""
         try:
-            candidate_info = context.get("candidate", {})
-            follow_up_type = context.get("follow_up_type", "general")
-            last_interaction = context.get("last_interaction", "")
-            
-            # Create follow-up prompt
-            system_prompt = f"""You are a recruiting agent following up with a candidate.
-
-Candidate: {candidate_info.get('name', 'Unknown')}
-Follow-up Type: {follow_up_type}
-Last Interaction: {last_interaction}
-
-Create a personalized, professional follow-up message that:
-1. References the last interaction
-2. Provides relevant updates
-3. Includes clear next steps
-4. Maintains engagement"""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Create follow-up for {follow_up_type}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
+            messages = self._build_follow_up_messages(context)
             
-            # Send follow-up email
-            email_sent = await self._send_follow_up_email(
-                candidate_info.get("email", ""),
-                response.content
-            )
-            
-            # Update candidate interaction history
-            await self._log_candidate_interaction(
-                candidate_info.get("id"),
-                "follow_up",
-                response.content
-            )
+            response = await self._invoke_llm(messages)
             
-            return {
-                "success": True,
-                "candidate_id": candidate_info.get("id"),
-                "follow_up_content": response.content,
-                "email_sent": email_sent,
-                "agent": "recruiting"
-            }
+            return await self._finalize_follow_up(context, response.content)
             
         except Exception as e:
-            logger.error(f"Candidate follow-up failed: {e}")
+            logger.error("Candidate follow-up failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "agent": "recruiting"
             }
     
+    def _build_follow_up_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for a candidate follow-up"""
+        candidate_info = context.get("candidate", {})
+        follow_up_type = context.get("follow_up_type", "general")
+        last_interaction = context.get("last_interaction", "")
+        
+        return [
+            SystemMessage(content=FOLLOW_UP_SYSTEM_PROMPT),
+            HumanMessage(content=f"Create follow-up for {follow_up_type}:\n" + self._to_prompt_json({
+                "candidate": candidate_info.get("name", "Unknown"),
+                "follow_up_type": follow_up_type,
+                "last_interaction": last_interaction
+            }))
+        ]
+    
+    async def _finalize_follow_up(self, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Send the follow-up drafted by the LLM and record the interaction"""
+        candidate_info = context.get("candidate", {})
+        
+        # Send follow-up email and update candidate interaction history concurrently
+        email_sent, _ = await asyncio.gather(
+            self._send_follow_up_email(
+                candidate_info.get("email", ""),
+                content
+            ),
+            self._log_candidate_interaction(
+                candidate_info.get("id"),
+                "follow_up",
+                content
+            )
+        )
+        
+        return {
+            "success": True,
+            "candidate_id": candidate_info.get("id"),
+            "follow_up_content": content,
+            "email_sent": email_sent,
+            "agent": "recruiting"
+        }
+    
     async def _update_pipeline(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Update recruiting pipeline and metrics"""
         try:
             # Get current pipeline data
             pipeline_data = await self._get_pipeline_data()
             
-            # Create pipeline analysis prompt
-            system_prompt = f"""You are a recruiting agent analyzing the current pipeline.
-
-Current Pipeline Data: {pipeline_data}
-
-Analyze and provide:
-1. Pipeline health assessment
-2. Bottleneck identification
-3. Conversion rate analysis
-4. Recommendations for improvement
-5. Action items for next steps"""
-
             messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content="Analyze current recruiting pipeline")
+                SystemMessage(content=UPDATE_PIPELINE_SYSTEM_PROMPT),
+                HumanMessage(content="Analyze current recruiting pipeline:\n" + self._to_prompt_json(pipeline_data))
             ]
             
-            response = await self.llm.ainvoke(messages)
-            
-            # Update pipeline metrics
-            metrics = await self._calculate_pipeline_metrics(pipeline_data)
+            # Metrics only need the pipeline data, so compute them alongside the analysis
+            response, metrics = await asyncio.gather(
+                self._invoke_llm(messages),
+                self._calculate_pipeline_metrics(pipeline_data)
+            )
             
             return {
                 "success": True,
@@ -350,7 +574,7 @@ Analyze and provide:
             }
             
         except Exception as e:
-            logger.error(f"Pipeline update failed: {e}")
+            logger.error("Pipeline update failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -360,101 +584,124 @@ Analyze and provide:
     async def _general_recruiting_task(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Handle general recruiting tasks"""
         try:
-            task_description = context.get("description", "")
-            
-            system_prompt = self.config["system_prompt"]
+            messages = self._build_general_messages(context)
             
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Task: {task_description}")
-            ]
+            response = await self._invoke_llm(messages)
             
-            response = await self.llm.ainvoke(messages)
-            
-            return {
-                "success": True,
-                "response": response.content,
-                "agent": "recruiting"
-            }
+            return await self._finalize_general_task(context, response.content)
             
         except Exception as e:
-            logger.error(f"General recruiting task failed: {e}")
+            logger.error("General recruiting task failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "agent": "recruiting"
             }
     
+    def _build_general_messages(self, context: Dict[str, Any]) -> List[Any]:
+        """Build LLM messages for a general recruiting task"""
+        task_description = context.get("description", "")
+        
+        return [
+            SystemMessage(content=self._general_system_prompt),
+            HumanMessage(content=f"Task: {task_description}")
+        ]
+    
+    async def _finalize_general_task(self, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Turn a general recruiting response into the agent result"""
+        return {
+            "success": True,
+            "response": content,
+            "agent": "recruiting"
+        }
+    
     # Helper methods
     
+    def _to_prompt_json(self, data: Any) -> str:
+        """Serialize data as compact, key-sorted JSON so equal inputs give identical prompts"""
+        return orjson.dumps(data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
+    
+    async def _invoke_llm(self, messages: List[Any], schema: Optional[type] = None) -> Any:
+        """Invoke the LLM (or its structured-output variant for schema), serving identical prompts from cache"""
+        if schema is None:
+            runnable = self.llm
+            model_key = settings.DEFAULT_LLM_MODEL
+        else:
+            runnable = self._get_structured_llm(schema)
+            model_key = f"{settings.DEFAULT_LLM_MODEL}:{schema.__name__}"
+        
+        key = LLMCache.cache_key(model_key, self.config.temperature, messages)
+        return await self.cache.get_or_compute(key, lambda: runnable.ainvoke(messages))
+    
+    def _get_structured_llm(self, schema: type) -> Any:
+        """Get the structured-output runnable for schema, building it on first use"""
+        runnable = self._structured_llms.get(schema)
+        if runnable is None:
+            # Built here rather than in __init__ so a client without structured output only fails the call that needs it
+            runnable = self.llm.with_structured_output(schema)
+            self._structured_llms[schema] = runnable
+        return runnable
+    
+    async def _invoke_llm_semantic(self, messages: List[Any], namespace: str, content: str, schema: Optional[type] = None) -> Any:
+        """Invoke the LLM, reusing responses for near-duplicate inputs when semantic caching is on"""
+        if self.semantic_cache is None:
+            return await self._invoke_llm(messages, schema)
+        return await self.semantic_cache.get_or_compute(namespace, content, lambda: self._invoke_llm(messages, schema))
+    
+    async def _get_zoho(self) -> Optional[ZohoIntegration]:
+        """Get the Zoho integration, initializing it on first use (None in mock mode)"""
+        if self.zoho is None and not settings.is_mock_mode():
+            async with self._zoho_lock:
+                if self.zoho is None:
+                    zoho = ZohoIntegration()
+                    await zoho.initialize()
+                    self.zoho = zoho
+        return self.zoho
+    
+    async def _get_google(self) -> Optional[GoogleIntegration]:
+        """Get the Google integration, initializing it on first use (None in mock mode)"""
+        if self.google is None and not settings.is_mock_mode():
+            async with self._google_lock:
+                if self.google is None:
+                    google = GoogleIntegration()
+                    await google.initialize()
+                    self.google = google
+        return self.google
+    
     async def _search_candidates_in_crm(self, requirements: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search for candidates in CRM system"""
-        if self.zoho:
-            return await self.zoho.search_contacts(requirements)
+        zoho = await self._get_zoho()
+        if zoho:
+            return await zoho.search_candidates(requirements)
         return []
     
     def _generate_mock_candidates(self) -> List[Dict[str, Any]]:
         """Generate mock candidates for demo purposes"""
-        return [
-            {
-                "id": "mock_candidate_1",
-                "name": "Sarah Johnson",
-                "email": "sarah.johnson@email.com",
-                "phone": "(555) 123-4567",
-                "experience_years": 5,
-                "current_company": "ABC Realty",
-                "status": "active",
-                "source": "LinkedIn"
-            },
-            {
-                "id": "mock_candidate_2",
-                "name": "Mike Chen",
-                "email": "mike.chen@email.com",
-                "phone": "(555) 234-5678",
-                "experience_years": 3,
-                "current_company": "XYZ Properties",
-                "status": "passive",
-                "source": "Referral"
-            }
-        ]
-    
-    def _extract_qualification_score(self, evaluation_text: str) -> int:
-        """Extract qualification score from evaluation text"""
-        # Simple extraction logic - in production, this would be more sophisticated
-        if "highly qualified" in evaluation_text.lower():
-            return 85
-        elif "qualified" in evaluation_text.lower():
-            return 75
-        elif "partially qualified" in evaluation_text.lower():
-            return 60
-        else:
-            return 45
+        return list(_MOCK_CANDIDATES)
     
     def _extract_recommendations(self, text: str) -> List[str]:
         """Extract actionable recommendations from text"""
         # Simple extraction - in production, this would use NLP
         recommendations = []
-        lines = text.split('\n')
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['recommend', 'suggest', 'should', 'action']):
-                recommendations.append(line.strip())
-        return recommendations[:5]  # Limit to top 5
+        for match in _RECOMMENDATION_LINE.finditer(text):
+            recommendations.append(match.group(0).strip())
+            if len(recommendations) == 5:  # Limit to top 5
+                break
+        return recommendations
     
     async def _update_candidate_status(self, candidate_id: str, status: str, notes: str):
-        """Update candidate status in database"""
-        try:
-            await db_manager.update_record("candidates", candidate_id, {
-                "status": status,
-                "notes": notes,
-                "updated_at": datetime.now().isoformat()
-            })
-        except Exception as e:
-            logger.error(f"Failed to update candidate status: {e}")
+        """Queue a candidate status update for the batched database writer"""
+        await self.candidate_updates.put({
+            "id": candidate_id,
+            "status": status,
+            "notes": notes
+        })
     
     async def _create_calendar_event(self, candidate: Dict, interviewer_email: str, time_slot: str):
         """Create calendar event for interview"""
-        if self.google:
-            return await self.google.create_calendar_event({
+        google = await self._get_google()
+        if google:
+            return await google.create_calendar_event({
                 "title": f"Interview with {candidate.get('name', 'Candidate')}",
                 "start_time": time_slot,
                 "attendees": [candidate.get("email"), interviewer_email],
@@ -465,11 +712,12 @@ Analyze and provide:
     async def _send_interview_invitation(self, candidate_email: str, content: str, calendar_event: Dict):
         """Send interview invitation email"""
         if settings.is_mock_mode():
-            logger.info(f"Mock: Sending interview invitation to {candidate_email}")
+            logger.info("Mock: Sending interview invitation to %s", candidate_email)
             return True
         
-        if self.google:
-            return await self.google.send_email({
+        google = await self._get_google()
+        if google:
+            return await google.send_email({
                 "to": candidate_email,
                 "subject": "Interview Invitation - Impact Realty AI",
                 "body": content,
@@ -480,11 +728,12 @@ Analyze and provide:
     async def _send_follow_up_email(self, candidate_email: str, content: str):
         """Send follow-up email to candidate"""
         if settings.is_mock_mode():
-            logger.info(f"Mock: Sending follow-up email to {candidate_email}")
+            logger.info("Mock: Sending follow-up email to %s", candidate_email)
             return True
         
-        if self.google:
-            return await self.google.send_email({
+        google = await self._get_google()
+        if google:
+            return await google.send_email({
                 "to": candidate_email,
                 "subject": "Follow-up - Impact Realty AI Opportunity",
                 "body": content
@@ -495,47 +744,58 @@ Analyze and provide:
         """Log candidate interaction"""
         try:
             # This could be stored in a candidate_interactions table
-            logger.info(f"Candidate {candidate_id} interaction: {interaction_type}")
+            logger.info("Candidate %s interaction: %s", candidate_id, interaction_type)
         except Exception as e:
-            logger.error(f"Failed to log candidate interaction: {e}")
+            logger.error("Failed to log candidate interaction: %s", e)
     
     async def _get_pipeline_data(self) -> Dict[str, Any]:
         """Get current pipeline data"""
         try:
-            # Get candidates by status
-            candidates = await db_manager.list_records("candidates")
-            
-            pipeline_data = {
-                "total_candidates": len(candidates),
-                "by_status": {},
-                "by_source": {},
-                "recent_activity": []
-            }
-            
-            for candidate in candidates:
-                status = candidate.get("status", "unknown")
-                source = candidate.get("source", "unknown")
-                
-                pipeline_data["by_status"][status] = pipeline_data["by_status"].get(status, 0) + 1
-                pipeline_data["by_source"][source] = pipeline_data["by_source"].get(source, 0) + 1
+            # Aggregate in the database instead of pulling every candidate row
+            total_candidates, by_status, by_source, recent_activity = await asyncio.gather(
+                db_manager.count_records("candidates"),
+                db_manager.aggregate("candidates", "status"),
+                db_manager.aggregate("candidates", "source"),
+                self._get_recent_activity()
+            )
             
-            return pipeline_data
+            return {
+                "total_candidates": total_candidates,
+                "by_status": by_status,
+                "by_source": by_source,
+                "recent_activity": recent_activity
+            }
             
         except Exception as e:
-            logger.error(f"Failed to get pipeline data: {e}")
+            logger.error("Failed to get pipeline data: %s", e)
             return {}
     
+    async def _get_recent_activity(self) -> List[Dict[str, Any]]:
+        """Get the most recently updated candidates, streamed with only the columns the analysis needs"""
+        return [
+            row async for row in db_manager.iter_records(
+                "candidates",
+                order_by="updated_at",
+                desc=True,
+                columns=self.RECENT_ACTIVITY_COLUMNS,
+                limit=self.RECENT_ACTIVITY_LIMIT
+            )
+        ]
+    
     async def _calculate_pipeline_metrics(self, pipeline_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate pipeline metrics"""
         try:
             total = pipeline_data.get("total_candidates", 0)
             by_status = pipeline_data.get("by_status", {})
             
+            # One division; each rate is then a multiply (0 for an empty pipeline)
+            percent_per_candidate = 100 / total if total > 0 else 0
+            
             metrics = {
                 "total_candidates": total,
-                "qualified_rate": (by_status.get("qualified", 0) / total * 100) if total > 0 else 0,
-                "interview_rate": (by_status.get("interview", 0) / total * 100) if total > 0 else 0,
-                "hire_rate": (by_status.get("hired", 0) / total * 100) if total > 0 else 0,
+                "qualified_rate": by_status.get("qualified", 0) * percent_per_candidate,
+                "interview_rate": by_status.get("interview", 0) * percent_per_candidate,
+                "hire_rate": by_status.get("hired", 0) * percent_per_candidate,
                 "active_candidates": by_status.get("active", 0),
                 "pipeline_health": "good" if total > 10 else "needs_attention"
             }
@@ -543,25 +803,30 @@ Analyze and provide:
             return metrics
             
         except Exception as e:
-            logger.error(f"Failed to calculate metrics: {e}")
+            logger.error("Failed to calculate metrics: %s", e)
             return {}
     
     async def get_status(self) -> Dict[str, Any]:
         """Get agent status"""
         return {
-            "name": self.config["name"],
+            "name": self.config.name,
             "status": "healthy" if self.is_initialized else "initializing",
             "initialized": self.is_initialized,
             "integrations": {
                 "zoho": "connected" if self.zoho else "not_connected",
                 "google": "connected" if self.google else "not_connected"
             },
+            "llm_cache": self.cache.get_stats(),
+            "semantic_cache": self.semantic_cache.get_stats() if self.semantic_cache else None,
             "mock_mode": settings.is_mock_mode()
         }
     
     async def shutdown(self):
         """Shutdown agent and cleanup resources"""
         try:
+            # Write out queued candidate updates before the integrations go away
+            await self.candidate_updates.stop()
+            
             if self.zoho:
                 await self.zoho.shutdown()
             if self.google:
@@ -571,4 +836,4 @@ Analyze and provide:
             logger.info("Recruiting Agent shutdown completed")
             
         except Exception as e:
-            logger.error(f"Error during Recruiting Agent shutdown: {e}") 
\ No newline at end of file
+            logger.error("Error during Recruiting Agent shutdown: %s", e) 
\ No newline at end of file
@@ -3,20 +3,28 @@ Supervisor Agent - Orchestrates all other agents using LangGraph
 """
 
 import asyncio
+import hashlib
 import logging
+import re
 from typing import Dict, Any, List, Optional, TypedDict
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 
+import numpy as np
+import orjson
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_anthropic import ChatAnthropic
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolExecutor
+from langgraph.checkpoint.base import CheckpointAt
 from langgraph.checkpoint.memory import MemorySaver
 
 from core.config import settings, AgentConfig
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from core.database import db_manager
+from core.llm_cache import LLMCache, InMemoryLRU, SemanticLLMCache
+from core.llm_pool import get_http_client
 from .recruiting import RecruitingAgent
 from .compliance import ComplianceAgent
 from .deal_management import DealManagementAgent
@@ -25,6 +33,90 @@ from .analytics import AnalyticsAgent
 
 logger = logging.getLogger(__name__)
 
+# Routing instructions carry no per-workflow data so the provider can cache the prefix;
+# the workflow, context and previous results travel as JSON in the HumanMessage
+SUPERVISOR_SYSTEM_PROMPT = """You are the Supervisor Agent for Impact Realty AI.
+
+Your role is to orchestrate a multi-agent workflow. The user message contains the workflow type, its context and the results of the agents that have already run, as JSON.
+
+Available agents:
+- recruiting: Handles candidate sourcing, qualification, and engagement
+- compliance: Manages document validation and regulatory compliance
+- deal_management: Orchestrates transaction workflows and deal management
+- communication: Handles email, calendar, and CRM communications
+- analytics: Provides performance metrics and business insights
+
+Analyze the workflow requirements and determine which agent should handle the next step.
+If the workflow is complete, respond with 'COMPLETE'.
+
+Respond with only the agent name or 'COMPLETE'."""
+
+# Workflows whose agents are known up front: {workflow_type: {agent: [agents it depends on]}}.
+# These run as a precomputed plan with independent agents in parallel, without LLM routing.
+WORKFLOW_PLANS: Dict[str, Dict[str, List[str]]] = {
+    **{
+        task_type: {"recruiting": []}
+        for task_type in ("source_candidates", "qualify_candidate", "schedule_interview", "follow_up", "update_pipeline")
+    },
+    **{
+        task_type: {"compliance": []}
+        for task_type in ("validate_document", "check_license", "review_contract", "audit_deal", "generate_report")
+    },
+    # Candidate evaluation and license verification don't depend on each other, so they run side by side
+    "onboard_agent": {"recruiting": [], "compliance": []},
+}
+
+# Task each agent runs within a multi-agent workflow; single-agent workflows use the workflow type
+WORKFLOW_AGENT_TASKS: Dict[str, Dict[str, str]] = {
+    "onboard_agent": {"recruiting": "qualify_candidate", "compliance": "check_license"},
+}
+
+
+def _plan_stages(plan: Dict[str, List[str]]) -> List[List[str]]:
+    """Group a dependency plan into stages whose agents can all run concurrently"""
+    stages = []
+    done = set()
+    pending = dict(plan)
+    
+    while pending:
+        ready = [agent for agent, deps in pending.items() if done.issuperset(deps)]
+        if not ready:
+            raise ValueError(f"Workflow plan has a dependency cycle or unknown agent: {pending}")
+        stages.append(ready)
+        done.update(ready)
+        for agent in ready:
+            del pending[agent]
+    
+    return stages
+
+
+WORKFLOW_STAGES: Dict[str, List[List[str]]] = {
+    workflow_type: _plan_stages(plan) for workflow_type, plan in WORKFLOW_PLANS.items()
+}
+
+# Keywords in an unplanned workflow type that select an agent, in routing order
+ROUTING_KEYWORDS: Dict[str, List[str]] = {
+    "recruiting": ["recruit", "candidate", "interview", "hiring", "onboard"],
+    "compliance": ["compliance", "license", "contract", "document", "audit", "frec"],
+    "deal_management": ["deal", "transaction", "closing", "listing", "offer"],
+    "communication": ["email", "calendar", "message", "notify", "outreach"],
+    "analytics": ["analytics", "metric", "report", "performance", "insight"],
+}
+
+_ROUTING_PATTERNS = {
+    agent: re.compile("|".join(keywords), re.IGNORECASE)
+    for agent, keywords in ROUTING_KEYWORDS.items()
+}
+
+# Agent descriptions matched against workflow types by embedding similarity
+ROUTING_DESCRIPTIONS: Dict[str, str] = {
+    "recruiting": AgentConfig.RECRUITING_AGENT.description,
+    "compliance": AgentConfig.COMPLIANCE_AGENT.description,
+    "deal_management": AgentConfig.DEAL_MANAGEMENT_AGENT.description,
+    "communication": AgentConfig.COMMUNICATION_AGENT.description,
+    "analytics": AgentConfig.ANALYTICS_AGENT.description,
+}
+
 
 class AgentState(TypedDict):
     """State shared between agents in the workflow"""
@@ -39,6 +131,8 @@ class AgentState(TypedDict):
     results: Dict[str, Any]
     errors: List[str]
     completed: bool
+    # Request-scoped memo: agent name -> hash of the context it last ran with
+    agent_memo: Dict[str, str]
 
 
 class SupervisorAgent:
@@ -48,31 +142,77 @@ class SupervisorAgent:
     
     def __init__(self):
         self.llm = self._initialize_llm()
+        
+        # Fail routing fast during provider outages instead of timing out on every hop
+        self.llm_breaker = CircuitBreaker(
+            "supervisor_llm",
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_CIRCUIT_RESET_TIMEOUT
+        )
         self.agents = {}
+        
+        # Agent sequences per workflow type resolved by keyword rules or embedding match
+        self._rule_routes: Dict[str, List[str]] = {}
+        self.routing_embeddings = None
+        self._description_vectors: Optional[np.ndarray] = None
+        if settings.ROUTING_EMBEDDINGS_ENABLED:
+            self.routing_embeddings = OpenAIEmbeddings(model=settings.EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY)
         self.workflow_graph = None
-        self.memory = MemorySaver()
+        # Workflows never resume mid-run, so checkpoint the final state only instead of after every node
+        self.memory = MemorySaver(at=CheckpointAt.END_OF_RUN)
         self.is_initialized = False
         
+        # Workflow log writes run in the background; keep references until they finish
+        self._pending_logs: set = set()
+        self._workflow_start_logs: Dict[str, asyncio.Task] = {}
+        
+        # Routing decisions reused for the same workflow type, context and completed agents
+        self.routing_cache = LLMCache(
+            InMemoryLRU(max_size=settings.LLM_CACHE_MAX_SIZE),
+            ttl=settings.ROUTING_CACHE_TTL
+        )
+        
+        # Fuzzy tier: near-identical contexts for the same workflow type and progress
+        self.semantic_routing_cache = None
+        if settings.SEMANTIC_CACHE_ENABLED:
+            self.semantic_routing_cache = SemanticLLMCache(
+                OpenAIEmbeddings(model=settings.EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY),
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                max_size=settings.LLM_CACHE_MAX_SIZE
+            )
+        
+    # Routing answers are a single agent name, so cap generation well below a sentence
+    ROUTING_MAX_TOKENS = 8
+    
     def _initialize_llm(self):
-        """Initialize the LLM for the supervisor"""
-        if settings.DEFAULT_LLM_MODEL.startswith("gpt"):
+        """Initialize the small, fast routing LLM for the supervisor"""
+        if settings.SUPERVISOR_LLM_MODEL.startswith("gpt"):
             return ChatOpenAI(
-                model=settings.DEFAULT_LLM_MODEL,
-                temperature=0.3,
-                api_key=settings.OPENAI_API_KEY
+                model=settings.SUPERVISOR_LLM_MODEL,
+                temperature=0,
+                max_tokens=self.ROUTING_MAX_TOKENS,
+                max_retries=2,
+                timeout=15,
+                api_key=settings.OPENAI_API_KEY,
+                http_async_client=get_http_client()
             )
-        elif settings.DEFAULT_LLM_MODEL.startswith("claude"):
+        elif settings.SUPERVISOR_LLM_MODEL.startswith("claude"):
             return ChatAnthropic(
-                model=settings.DEFAULT_LLM_MODEL,
-                temperature=0.3,
+                model=settings.SUPERVISOR_LLM_MODEL,
+                temperature=0,
+                max_tokens=self.ROUTING_MAX_TOKENS,
                 api_key=settings.ANTHROPIC_API_KEY
             )
         else:
             # Default to OpenAI
             return ChatOpenAI(
-                model="gpt-4-turbo-preview",
-                temperature=0.3,
-                api_key=settings.OPENAI_API_KEY
+                model="gpt-4o-mini",
+                temperature=0,
+                max_tokens=self.ROUTING_MAX_TOKENS,
+                max_retries=2,
+                timeout=15,
+                api_key=settings.OPENAI_API_KEY,
+                http_async_client=get_http_client()
             )
     
     async def initialize(self):
@@ -89,10 +229,11 @@ class SupervisorAgent:
                 "analytics": AnalyticsAgent()
             }
             
-            # Initialize each agent
-            for agent_name, agent in self.agents.items():
-                await agent.initialize()
-                logger.info(f"Initialized {agent_name} agent")
+            # Initialize agents concurrently; startup waits only for the slowest one
+            await asyncio.gather(*(
+                self._initialize_agent(agent_name, agent)
+                for agent_name, agent in self.agents.items()
+            ))
             
             # Build workflow graph
             self._build_workflow_graph()
@@ -104,6 +245,11 @@ class SupervisorAgent:
             logger.error(f"Failed to initialize Supervisor Agent: {e}")
             raise
     
+    async def _initialize_agent(self, agent_name: str, agent: Any):
+        """Initialize one agent, bounded by the agent timeout"""
+        await asyncio.wait_for(agent.initialize(), timeout=settings.AGENT_TIMEOUT)
+        logger.info(f"Initialized {agent_name} agent")
+    
     def _build_workflow_graph(self):
         """Build the LangGraph workflow"""
         
@@ -112,11 +258,9 @@ class SupervisorAgent:
         
         # Add nodes for each agent
         workflow.add_node("supervisor", self._supervisor_node)
-        workflow.add_node("recruiting", self._recruiting_node)
-        workflow.add_node("compliance", self._compliance_node)
-        workflow.add_node("deal_management", self._deal_management_node)
-        workflow.add_node("communication", self._communication_node)
-        workflow.add_node("analytics", self._analytics_node)
+        workflow.add_node("plan", self._plan_node)
+        for agent_name in self.agents:
+            workflow.add_node(agent_name, self._make_agent_node(agent_name))
         workflow.add_node("end", self._end_node)
         
         # Set entry point
@@ -127,17 +271,17 @@ class SupervisorAgent:
             "supervisor",
             self._route_to_agent,
             {
-                "recruiting": "recruiting",
-                "compliance": "compliance",
-                "deal_management": "deal_management",
-                "communication": "communication",
-                "analytics": "analytics",
+                **{agent_name: agent_name for agent_name in self.agents},
+                "plan": "plan",
                 "end": "end"
             }
         )
         
+        # A planned workflow runs every agent it needs in one node
+        workflow.add_edge("plan", "end")
+        
         # Add edges back to supervisor from each agent
-        for agent_name in ["recruiting", "compliance", "deal_management", "communication", "analytics"]:
+        for agent_name in self.agents:
             workflow.add_edge(agent_name, "supervisor")
         
         # End node
@@ -153,50 +297,49 @@ class SupervisorAgent:
             context = state["context"]
             results = state["results"]
             
-            # Create supervisor prompt
-            system_prompt = f"""You are the Supervisor Agent for Impact Realty AI. 
+            # Known workflows skip LLM routing and run their precomputed plan
+            if workflow_type in WORKFLOW_STAGES and not results:
+                state["next_agent"] = "plan"
+                state["current_agent"] = "plan"
+                await self._log_workflow_step(
+                    state["workflow_id"],
+                    "supervisor",
+                    "routing_decision",
+                    {"next_agent": "plan", "stages": WORKFLOW_STAGES[workflow_type]}
+                )
+                return state
+            
+            # Keyword rules and embedding matches route without an LLM call
+            next_agent = await self._route_without_llm(workflow_type, results)
+            if next_agent is not None:
+                return await self._apply_routing(state, next_agent, "routing rule")
             
-Your role is to orchestrate a multi-agent workflow for: {workflow_type}
-
-Available agents:
-- recruiting: Handles candidate sourcing, qualification, and engagement
-- compliance: Manages document validation and regulatory compliance  
-- deal_management: Orchestrates transaction workflows and deal management
-- communication: Handles email, calendar, and CRM communications
-- analytics: Provides performance metrics and business insights
-
-Current context: {context}
-Previous results: {results}
-
-Analyze the workflow requirements and determine which agent should handle the next step.
-If the workflow is complete, respond with 'COMPLETE'.
-
-Respond with only the agent name or 'COMPLETE'."""
-
             messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Workflow: {workflow_type}, Context: {context}")
+                SystemMessage(content=SUPERVISOR_SYSTEM_PROMPT),
+                HumanMessage(content=self._to_prompt_json({
+                    "workflow": workflow_type,
+                    "context": context,
+                    "previous_results": {
+                        agent_name: self._summarize_result(result) for agent_name, result in results.items()
+                    }
+                }))
             ]
             
-            response = await self.llm.ainvoke(messages)
-            next_agent = response.content.strip().lower()
-            
-            if next_agent == "complete":
-                state["completed"] = True
-                state["next_agent"] = "end"
-            else:
-                state["next_agent"] = next_agent
-                state["current_agent"] = next_agent
+            try:
+                response = await self._route_with_cache(workflow_type, context, results, messages)
+            except CircuitOpenError as e:
+                # No LLM available: finish with the results gathered so far
+                logger.warning(f"Supervisor routing skipped: {e}")
+                if results:
+                    return await self._apply_routing(state, "complete", "routing LLM unavailable")
+                raise
             
-            # Log the decision
-            await self._log_workflow_step(
-                state["workflow_id"],
-                "supervisor",
-                "routing_decision",
-                {"next_agent": next_agent, "reasoning": response.content}
-            )
-            
-            return state
+            next_agent = response.content.strip().lower()
+            if next_agent in results:
+                # The agent would reuse its memoized result and hand back an unchanged state, looping forever
+                logger.info(f"Workflow {state['workflow_id']} - {next_agent} already finished, completing")
+                next_agent = "complete"
+            return await self._apply_routing(state, next_agent, response.content)
             
         except Exception as e:
             logger.error(f"Supervisor node error: {e}")
@@ -204,121 +347,212 @@ Respond with only the agent name or 'COMPLETE'."""
             state["next_agent"] = "end"
             return state
     
-    def _route_to_agent(self, state: AgentState) -> str:
-        """Route to the appropriate agent based on supervisor decision"""
-        return state.get("next_agent", "end")
+    def _to_prompt_json(self, data: Any) -> str:
+        """Serialize data as compact, key-sorted JSON for prompt embedding"""
+        return orjson.dumps(data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
     
-    async def _recruiting_node(self, state: AgentState) -> AgentState:
-        """Recruiting agent node"""
-        try:
-            agent = self.agents["recruiting"]
-            result = await agent.execute(state["context"])
-            
-            state["results"]["recruiting"] = result
-            state["messages"].append({
-                "agent": "recruiting",
-                "result": result,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return state
-            
-        except Exception as e:
-            logger.error(f"Recruiting agent error: {e}")
-            state["errors"].append(f"Recruiting agent error: {str(e)}")
-            return state
+    def _summarize_result(self, result: Any) -> str:
+        """Serialize an agent result for prompts and logs, capped at MAX_RESULT_CHARS"""
+        summary = self._to_prompt_json(result)
+        if len(summary) > settings.MAX_RESULT_CHARS:
+            return summary[:settings.MAX_RESULT_CHARS] + "...[truncated]"
+        return summary
     
-    async def _compliance_node(self, state: AgentState) -> AgentState:
-        """Compliance agent node"""
-        try:
-            agent = self.agents["compliance"]
-            result = await agent.execute(state["context"])
-            
-            state["results"]["compliance"] = result
-            state["messages"].append({
-                "agent": "compliance",
-                "result": result,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return state
-            
-        except Exception as e:
-            logger.error(f"Compliance agent error: {e}")
-            state["errors"].append(f"Compliance agent error: {str(e)}")
-            return state
+    async def _apply_routing(self, state: AgentState, next_agent: str, reasoning: str) -> AgentState:
+        """Record the routing decision in the state and the workflow log"""
+        if next_agent == "complete":
+            state["completed"] = True
+            state["next_agent"] = "end"
+        else:
+            state["next_agent"] = next_agent
+            state["current_agent"] = next_agent
+        
+        # Log the decision
+        await self._log_workflow_step(
+            state["workflow_id"],
+            "supervisor",
+            "routing_decision",
+            {"next_agent": next_agent, "reasoning": reasoning}
+        )
+        
+        return state
     
-    async def _deal_management_node(self, state: AgentState) -> AgentState:
-        """Deal management agent node"""
+    async def _route_without_llm(self, workflow_type: str, results: Dict[str, Any]) -> Optional[str]:
+        """Pick the next agent from keyword rules or an embedding match, or None if neither applies"""
+        route = self._rule_routes.get(workflow_type)
+        
+        if route is None:
+            route = [agent for agent, pattern in _ROUTING_PATTERNS.items() if pattern.search(workflow_type)]
+            if not route:
+                agent = await self._match_agent_description(workflow_type)
+                if agent is None:
+                    return None
+                route = [agent]
+            # Workflow types come from requests, so keep the memo bounded
+            if len(self._rule_routes) < settings.LLM_CACHE_MAX_SIZE:
+                self._rule_routes[workflow_type] = route
+        
+        for agent in route:
+            if agent not in results:
+                return agent
+        return "complete"
+    
+    async def _match_agent_description(self, workflow_type: str) -> Optional[str]:
+        """Match a workflow type to the most similar agent description above the threshold"""
+        if self.routing_embeddings is None:
+            return None
+        
         try:
-            agent = self.agents["deal_management"]
-            result = await agent.execute(state["context"])
-            
-            state["results"]["deal_management"] = result
-            state["messages"].append({
-                "agent": "deal_management",
-                "result": result,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return state
-            
+            if self._description_vectors is None:
+                vectors = np.asarray(
+                    await self.routing_embeddings.aembed_documents(list(ROUTING_DESCRIPTIONS.values())),
+                    dtype=np.float32
+                )
+                self._description_vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            
+            query = np.asarray(
+                await self.routing_embeddings.aembed_query(workflow_type.replace("_", " ")),
+                dtype=np.float32
+            )
+            similarities = self._description_vectors @ (query / np.linalg.norm(query))
         except Exception as e:
-            logger.error(f"Deal management agent error: {e}")
-            state["errors"].append(f"Deal management agent error: {str(e)}")
-            return state
+            logger.error(f"Embedding routing failed: {e}")
+            return None
+        
+        best = int(np.argmax(similarities))
+        if similarities[best] < settings.ROUTING_EMBEDDING_THRESHOLD:
+            return None
+        return list(ROUTING_DESCRIPTIONS)[best]
     
-    async def _communication_node(self, state: AgentState) -> AgentState:
-        """Communication agent node"""
+    async def _route_with_cache(
+        self,
+        workflow_type: str,
+        context: Dict[str, Any],
+        results: Dict[str, Any],
+        messages: List[Any]
+    ) -> Any:
+        """Get the routing response, skipping the LLM when this decision was made before"""
+        # Keyed on the finished agents' outputs as the prompt sees them, so a new result means a new decision
+        routing_input = orjson.dumps(
+            [
+                workflow_type.lower(),
+                context,
+                {agent_name: self._summarize_result(result) for agent_name, result in results.items()}
+            ],
+            default=str,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+        key = hashlib.sha256(routing_input).hexdigest()
+        
+        async def compute():
+            if self.semantic_routing_cache is None:
+                return await self.llm_breaker.call(self._stream_routing_decision, messages)
+            namespace = f"supervisor:{workflow_type.lower()}:{','.join(sorted(results))}"
+            return await self.semantic_routing_cache.get_or_compute(
+                namespace,
+                routing_input.decode(),
+                lambda: self.llm_breaker.call(self._stream_routing_decision, messages)
+            )
+        
+        return await self.routing_cache.get_or_compute(key, compute)
+    
+    async def _stream_routing_decision(self, messages: List[Any]) -> Any:
+        """Stream the routing answer, stopping as soon as it names an agent or COMPLETE"""
+        valid_routes = {*self.agents, "complete"}
+        response = None
+        stream = self.llm.astream(messages)
         try:
-            agent = self.agents["communication"]
-            result = await agent.execute(state["context"])
-            
-            state["results"]["communication"] = result
-            state["messages"].append({
-                "agent": "communication",
-                "result": result,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return state
-            
-        except Exception as e:
-            logger.error(f"Communication agent error: {e}")
-            state["errors"].append(f"Communication agent error: {str(e)}")
-            return state
+            async for chunk in stream:
+                response = chunk if response is None else response + chunk
+                # No route name is a prefix of another, so the first exact match is final
+                if response.content.strip().lower() in valid_routes:
+                    break
+        finally:
+            await stream.aclose()
+        
+        if response is None:
+            raise ValueError("Routing LLM returned an empty response")
+        return response
+    
+    async def _plan_node(self, state: AgentState) -> AgentState:
+        """Run a planned workflow, executing each stage's independent agents concurrently"""
+        workflow_type = state["workflow_type"]
+        plan = WORKFLOW_PLANS[workflow_type]
+        
+        for stage in WORKFLOW_STAGES[workflow_type]:
+            # Agents of one stage share a single timestamp
+            timestamp = datetime.now(timezone.utc).isoformat()
+            await asyncio.gather(*(
+                self._run_planned_agent(agent_name, plan[agent_name], state, timestamp)
+                for agent_name in stage
+            ))
+        
+        return state
+    
+    async def _run_planned_agent(self, agent_name: str, dependencies: List[str], state: AgentState, timestamp: str):
+        """Execute one agent of a planned workflow with its task from the plan"""
+        workflow_type = state["workflow_type"]
+        task_type = WORKFLOW_AGENT_TASKS.get(workflow_type, {}).get(agent_name, workflow_type)
+        context = {"task_type": task_type, **state["context"]}
+        if dependencies:
+            context["upstream_results"] = {dep: state["results"].get(dep) for dep in dependencies}
+        
+        await self._execute_agent(agent_name, context, state, timestamp)
     
-    async def _analytics_node(self, state: AgentState) -> AgentState:
-        """Analytics agent node"""
+    async def _execute_agent(self, agent_name: str, context: Dict[str, Any], state: AgentState, timestamp: str):
+        """Run an agent and record its result (or error) in the workflow state"""
         try:
-            agent = self.agents["analytics"]
-            result = await agent.execute(state["context"])
+            result = await self.agents[agent_name].execute(context)
             
-            state["results"]["analytics"] = result
+            # Full output lives in results; the message log keeps a bounded summary
+            state["results"][agent_name] = result
             state["messages"].append({
-                "agent": "analytics",
-                "result": result,
-                "timestamp": datetime.now().isoformat()
+                "agent": agent_name,
+                "result": self._summarize_result(result),
+                "timestamp": timestamp
             })
             
-            return state
-            
         except Exception as e:
-            logger.error(f"Analytics agent error: {e}")
-            state["errors"].append(f"Analytics agent error: {str(e)}")
+            logger.error(f"{agent_name} agent error: {e}")
+            state["errors"].append(f"{agent_name} agent error: {str(e)}")
+    
+    def _route_to_agent(self, state: AgentState) -> str:
+        """Route to the appropriate agent based on supervisor decision"""
+        return state.get("next_agent", "end")
+    
+    def _make_agent_node(self, agent_name: str):
+        """Build the graph node that runs one agent on the workflow context"""
+        async def agent_node(state: AgentState) -> AgentState:
+            # Re-routing to an agent with an unchanged context reuses its earlier result
+            context_hash = hashlib.sha256(self._to_prompt_json(state["context"]).encode()).hexdigest()
+            if state["agent_memo"].get(agent_name) == context_hash and agent_name in state["results"]:
+                logger.info(f"Workflow {state['workflow_id']} - reusing {agent_name} result")
+                return state
+            
+            await self._execute_agent(
+                agent_name,
+                state["context"],
+                state,
+                datetime.now(timezone.utc).isoformat()
+            )
+            state["agent_memo"][agent_name] = context_hash
             return state
+        
+        return agent_node
     
     async def _end_node(self, state: AgentState) -> AgentState:
         """End node - finalize workflow"""
         state["completed"] = True
+        state["agent_memo"] = {}
         
-        # Log workflow completion
-        await self._log_workflow_completion(
+        # Log workflow completion in the background, after the start record exists
+        self._spawn_log(self._log_workflow_completion(
             state["workflow_id"],
             "completed" if not state["errors"] else "failed",
             state["results"],
-            state["errors"]
-        )
+            state["errors"],
+            after=self._workflow_start_logs.pop(state["workflow_id"], None)
+        ))
         
         return state
     
@@ -342,11 +576,14 @@ Respond with only the agent name or 'COMPLETE'."""
                 context=params,
                 results={},
                 errors=[],
-                completed=False
+                completed=False,
+                agent_memo={}
             )
             
-            # Log workflow start
-            await self._log_workflow_start(workflow_id, workflow_type, params)
+            # Log workflow start without holding up the workflow
+            self._workflow_start_logs[workflow_id] = self._spawn_log(
+                self._log_workflow_start(workflow_id, workflow_type, params)
+            )
             
             # Execute the workflow
             config = {"configurable": {"thread_id": workflow_id}}
@@ -362,6 +599,8 @@ Respond with only the agent name or 'COMPLETE'."""
             
         except Exception as e:
             logger.error(f"Workflow execution failed: {e}")
+            if 'workflow_id' in locals():
+                self._workflow_start_logs.pop(workflow_id, None)
             return {
                 "workflow_id": workflow_id if 'workflow_id' in locals() else str(uuid.uuid4()),
                 "status": "failed",
@@ -383,7 +622,8 @@ Respond with only the agent name or 'COMPLETE'."""
                 "supervisor": {
                     "status": "healthy" if self.is_initialized else "initializing",
                     "initialized": self.is_initialized,
-                    "llm_model": settings.DEFAULT_LLM_MODEL
+                    "llm_model": settings.SUPERVISOR_LLM_MODEL,
+                    "llm_circuit": self.llm_breaker.get_stats()
                 },
                 "agents": agent_statuses,
                 "workflow_graph": "compiled" if self.workflow_graph else "not_compiled"
@@ -408,9 +648,20 @@ Respond with only the agent name or 'COMPLETE'."""
         try:
             logger.info("Shutting down Supervisor Agent...")
             
-            for agent_name, agent in self.agents.items():
-                await agent.shutdown()
-                logger.info(f"Shutdown {agent_name} agent")
+            # Let in-flight workflow log writes land first
+            if self._pending_logs:
+                await asyncio.gather(*self._pending_logs, return_exceptions=True)
+            
+            # One agent failing to shut down must not keep the others running
+            outcomes = await asyncio.gather(
+                *(agent.shutdown() for agent in self.agents.values()),
+                return_exceptions=True
+            )
+            for agent_name, outcome in zip(self.agents, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Failed to shut down {agent_name} agent: {outcome}")
+                else:
+                    logger.info(f"Shutdown {agent_name} agent")
             
             self.is_initialized = False
             logger.info("Supervisor Agent shutdown completed")
@@ -418,6 +669,23 @@ Respond with only the agent name or 'COMPLETE'."""
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
     
+    def _spawn_log(self, coro) -> asyncio.Task:
+        """Run a workflow log write in the background"""
+        task = asyncio.create_task(coro)
+        self._pending_logs.add(task)
+        task.add_done_callback(self._pending_logs.discard)
+        return task
+    
+    @staticmethod
+    def _to_json_column(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize data for a JSONB column in one orjson pass"""
+        # Datetimes, numpy values and non-str keys would otherwise fail the insert
+        return orjson.loads(orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ))
+    
     async def _log_workflow_start(self, workflow_id: str, workflow_type: str, params: Dict[str, Any]):
         """Log workflow start"""
         try:
@@ -425,7 +693,7 @@ Respond with only the agent name or 'COMPLETE'."""
                 "id": workflow_id,
                 "workflow_id": workflow_id,  # For compatibility
                 "status": "running",
-                "input_data": params,
+                "input_data": self._to_json_column(params),
                 "started_at": datetime.now().isoformat(),
                 "executed_by": params.get("user_id")
             })
@@ -440,12 +708,23 @@ Respond with only the agent name or 'COMPLETE'."""
         except Exception as e:
             logger.error(f"Failed to log workflow step: {e}")
     
-    async def _log_workflow_completion(self, workflow_id: str, status: str, results: Dict[str, Any], errors: List[str]):
+    async def _log_workflow_completion(
+        self,
+        workflow_id: str,
+        status: str,
+        results: Dict[str, Any],
+        errors: List[str],
+        after: Optional[asyncio.Task] = None
+    ):
         """Log workflow completion"""
         try:
+            # The update needs the row written by the start log
+            if after is not None:
+                await after
+            
             await db_manager.update_record("workflow_executions", workflow_id, {
                 "status": status,
-                "output_data": results,
+                "output_data": self._to_json_column(results),
                 "error_message": "; ".join(errors) if errors else None,
                 "completed_at": datetime.now().isoformat()
             })
@@ -0,0 +1,77 @@
+"""
+Circuit breaker that fails fast while a downstream provider is unhealthy
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling through while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Open after consecutive failures, then let a single trial call through after a cooldown"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+    
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Call func through the breaker"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self.state = self.HALF_OPEN
+        elif self.state == self.HALF_OPEN:
+            # A trial call is already in flight
+            raise CircuitOpenError(f"{self.name} circuit is half-open")
+        
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # A cancelled trial says nothing about the provider; allow another one
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+            raise
+        except Exception:
+            self._record_failure()
+            raise
+        
+        self._record_success()
+        return result
+    
+    def _record_failure(self):
+        """Count a failure, opening the circuit at the threshold or on a failed trial call"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"{self.name} circuit opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def _record_success(self):
+        """Close the circuit and reset the failure count"""
+        if self.state != self.CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+    
+    def get_stats(self) -> dict:
+        """Get breaker state"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures
+        }
@@ -2,17 +2,31 @@
 Configuration settings for Impact Realty AI backend
 """
 
-from pydantic_settings import BaseSettings
-from pydantic import Field, validator
-from typing import List, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, field_validator
+from typing import List, Optional, Tuple
 import os
-from datetime import datetime
-import pytz
+import time
+import functools
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+# Last (timestamp, monotonic time) handed out by Settings.get_current_timestamp
+_timestamp_cache: Tuple[str, float] = ("", float("-inf"))
+TIMESTAMP_GRANULARITY = 0.1  # seconds
 
 
 class Settings(BaseSettings):
     """Application settings"""
     
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        frozen=True,
+        extra="ignore"
+    )
+    
     # Environment
     ENVIRONMENT: str = Field(default="development", env="ENVIRONMENT")
     DEBUG: bool = Field(default=True, env="DEBUG")
@@ -41,18 +55,50 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = Field(..., env="SUPABASE_URL")
     SUPABASE_KEY: str = Field(..., env="SUPABASE_KEY")
     SUPABASE_SERVICE_ROLE_KEY: str = Field(..., env="SUPABASE_SERVICE_ROLE_KEY")
+    DB_KEEPALIVE_INTERVAL: int = Field(default=60, env="DB_KEEPALIVE_INTERVAL")  # seconds, 0 disables
+    DB_HTTP_MAX_CONNECTIONS: int = Field(default=20, env="DB_HTTP_MAX_CONNECTIONS")
+    DB_HTTP_MAX_KEEPALIVE: int = Field(default=10, env="DB_HTTP_MAX_KEEPALIVE")
+    SUPABASE_DB_URL: Optional[str] = Field(default=None, env="SUPABASE_DB_URL")  # direct Postgres DSN for the CRUD pool
+    # Supabase's session-mode pooler allows 15 client connections per project, shared by every worker
+    DB_POOL_MIN_SIZE: int = Field(default=1, env="DB_POOL_MIN_SIZE")
+    DB_POOL_MAX_SIZE: int = Field(default=3, env="DB_POOL_MAX_SIZE")
+    DB_RETRY_ATTEMPTS: int = Field(default=3, env="DB_RETRY_ATTEMPTS")
+    DB_RETRY_BASE_DELAY: float = Field(default=0.05, env="DB_RETRY_BASE_DELAY")  # seconds
+    DB_READ_CACHE_TTL: int = Field(default=30, env="DB_READ_CACHE_TTL")  # seconds, 0 disables
+    DB_READ_CACHE_MAX_SIZE: int = Field(default=10000, env="DB_READ_CACHE_MAX_SIZE")
     
     # LLM Configuration
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
     ANTHROPIC_API_KEY: Optional[str] = Field(None, env="ANTHROPIC_API_KEY")
     DEFAULT_LLM_MODEL: str = Field(default="gpt-4-turbo-preview", env="DEFAULT_LLM_MODEL")
+    SUPERVISOR_LLM_MODEL: str = Field(default="gpt-4o-mini", env="SUPERVISOR_LLM_MODEL")
     LLM_TEMPERATURE: float = Field(default=0.7, env="LLM_TEMPERATURE")
     MAX_TOKENS: int = Field(default=4096, env="MAX_TOKENS")
+    LLM_MAX_CONCURRENCY: int = Field(default=20, env="LLM_MAX_CONCURRENCY")
+    LLM_LATENCY_SERVICE_TIER: str = Field(default="", env="LLM_LATENCY_SERVICE_TIER")  # e.g. "priority" (billed extra); empty sends none
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, env="LLM_CIRCUIT_FAILURE_THRESHOLD")
+    LLM_CIRCUIT_RESET_TIMEOUT: int = Field(default=30, env="LLM_CIRCUIT_RESET_TIMEOUT")  # seconds
+    
+    # LLM Response Cache
+    LLM_CACHE_TTL: int = Field(default=86400, env="LLM_CACHE_TTL")  # 24 hours
+    LLM_CACHE_MAX_SIZE: int = Field(default=1000, env="LLM_CACHE_MAX_SIZE")
+    SEMANTIC_CACHE_ENABLED: bool = Field(default=False, env="SEMANTIC_CACHE_ENABLED")
+    SEMANTIC_CACHE_THRESHOLD: float = Field(default=0.97, env="SEMANTIC_CACHE_THRESHOLD")
+    RECRUITING_SEMANTIC_CACHE_THRESHOLD: float = Field(default=0.93, env="RECRUITING_SEMANTIC_CACHE_THRESHOLD")
+    EMBEDDING_MODEL: str = Field(default="text-embedding-3-small", env="EMBEDDING_MODEL")
+    ROUTING_CACHE_TTL: int = Field(default=3600, env="ROUTING_CACHE_TTL")  # 1 hour
+    ROUTING_EMBEDDINGS_ENABLED: bool = Field(default=False, env="ROUTING_EMBEDDINGS_ENABLED")
+    ROUTING_EMBEDDING_THRESHOLD: float = Field(default=0.4, env="ROUTING_EMBEDDING_THRESHOLD")
     
     # Zoho Integration
     ZOHO_CLIENT_ID: Optional[str] = Field(None, env="ZOHO_CLIENT_ID")
     ZOHO_CLIENT_SECRET: Optional[str] = Field(None, env="ZOHO_CLIENT_SECRET")
     ZOHO_REFRESH_TOKEN: Optional[str] = Field(None, env="ZOHO_REFRESH_TOKEN")
+    ZOHO_MAX_CONCURRENCY: int = Field(default=10, env="ZOHO_MAX_CONCURRENCY")
+    ZOHO_REQUESTS_PER_MINUTE: int = Field(default=100, env="ZOHO_REQUESTS_PER_MINUTE")
+    ZOHO_MAX_RETRIES: int = Field(default=4, env="ZOHO_MAX_RETRIES")
+    ZOHO_GET_CACHE_TTL: int = Field(default=30, env="ZOHO_GET_CACHE_TTL")  # seconds, 0 disables
+    ZOHO_GET_CACHE_MAX_SIZE: int = Field(default=512, env="ZOHO_GET_CACHE_MAX_SIZE")
     
     # Broker Sumo Integration
     BROKER_SUMO_API_KEY: Optional[str] = Field(None, env="BROKER_SUMO_API_KEY")
@@ -74,6 +120,7 @@ class Settings(BaseSettings):
     AGENT_TIMEOUT: int = Field(default=300, env="AGENT_TIMEOUT")  # 5 minutes
     MAX_AGENT_RETRIES: int = Field(default=3, env="MAX_AGENT_RETRIES")
     AGENT_MEMORY_SIZE: int = Field(default=10, env="AGENT_MEMORY_SIZE")
+    MAX_RESULT_CHARS: int = Field(default=2000, env="MAX_RESULT_CHARS")
     
     # Workflow Configuration
     WORKFLOW_TIMEOUT: int = Field(default=1800, env="WORKFLOW_TIMEOUT")  # 30 minutes
@@ -94,21 +141,31 @@ class Settings(BaseSettings):
     ENABLE_METRICS: bool = Field(default=True, env="ENABLE_METRICS")
     SENTRY_DSN: Optional[str] = Field(None, env="SENTRY_DSN")
     
-    @validator("ALLOWED_ORIGINS", pre=True)
+    @field_validator("ALLOWED_ORIGINS", mode="before")
+    @classmethod
     def parse_cors_origins(cls, v):
         if isinstance(v, str):
             return [origin.strip() for origin in v.split(",")]
         return v
     
-    @validator("ALLOWED_HOSTS", pre=True)
+    @field_validator("ALLOWED_HOSTS", mode="before")
+    @classmethod
     def parse_allowed_hosts(cls, v):
         if isinstance(v, str):
             return [host.strip() for host in v.split(",")]
         return v
     
     def get_current_timestamp(self) -> str:
-        """Get current timestamp in ISO format"""
-        return datetime.now(pytz.UTC).isoformat()
+        """Get current timestamp in ISO format, reused for up to TIMESTAMP_GRANULARITY seconds"""
+        global _timestamp_cache
+        
+        now = time.monotonic()
+        if now - _timestamp_cache[1] < TIMESTAMP_GRANULARITY:
+            return _timestamp_cache[0]
+        
+        timestamp = datetime.now(timezone.utc).isoformat()
+        _timestamp_cache = (timestamp, now)
+        return timestamp
     
     def is_production(self) -> bool:
         """Check if running in production environment"""
@@ -117,25 +174,49 @@ class Settings(BaseSettings):
     def is_mock_mode(self) -> bool:
         """Check if mock mode is enabled"""
         return self.MOCK_MODE
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
 
 
-# Global settings instance
-settings = Settings()
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings, validating the environment on first use"""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Global settings instance, built lazily so importing AgentConfig/MCPConfig needs no env
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass(frozen=True, slots=True)
+class AgentSpec:
+    """Immutable configuration for one agent"""
+    name: str
+    description: str
+    system_prompt: str
+    tools: Tuple[str, ...]
+    max_iterations: int
+    temperature: float
+    latency_optimized: bool = False
+    
+    def __getitem__(self, key: str):
+        """Dict-style access for code written against the old config dicts"""
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        """Dict-style get for code written against the old config dicts"""
+        return getattr(self, key, default)
 
 
 # Agent-specific configurations
 class AgentConfig:
     """Configuration for individual agents"""
     
-    RECRUITING_AGENT = {
-        "name": "recruiting_agent",
-        "description": "Handles candidate sourcing, qualification, and engagement",
-        "system_prompt": """You are a recruiting agent for Impact Realty AI. Your role is to:
+    RECRUITING_AGENT = AgentSpec(
+        name="recruiting_agent",
+        description="Handles candidate sourcing, qualification, and engagement",
+        system_prompt="""You are a recruiting agent for Impact Realty AI. Your role is to:
 1. Source and qualify real estate agent candidates
 2. Engage with potential candidates through various channels
 3. Screen candidates based on predefined criteria
@@ -143,15 +224,16 @@ class AgentConfig:
 5. Maintain candidate pipeline and status updates
 
 Always be professional, informative, and helpful. Focus on finding quality candidates who fit the company culture and requirements.""",
-        "tools": ["zoho_crm", "email", "calendar", "linkedin"],
-        "max_iterations": 10,
-        "temperature": 0.7
-    }
+        tools=("zoho_crm", "email", "calendar", "linkedin"),
+        max_iterations=10,
+        temperature=0.7,
+        latency_optimized=True
+    )
     
-    COMPLIANCE_AGENT = {
-        "name": "compliance_agent",
-        "description": "Manages document validation and regulatory compliance",
-        "system_prompt": """You are a compliance agent for Impact Realty AI. Your responsibilities include:
+    COMPLIANCE_AGENT = AgentSpec(
+        name="compliance_agent",
+        description="Manages document validation and regulatory compliance",
+        system_prompt="""You are a compliance agent for Impact Realty AI. Your responsibilities include:
 1. Validating real estate documents and contracts
 2. Ensuring compliance with Florida Real Estate Commission (FREC) regulations
 3. Checking Equal Housing Opportunity requirements
@@ -159,15 +241,16 @@ Always be professional, informative, and helpful. Focus on finding quality candi
 5. Generating compliance reports and alerts
 
 Always prioritize accuracy and regulatory compliance. Flag any potential issues immediately.""",
-        "tools": ["document_analyzer", "zoho_crm", "compliance_checker"],
-        "max_iterations": 5,
-        "temperature": 0.3
-    }
+        tools=("document_analyzer", "zoho_crm", "compliance_checker"),
+        max_iterations=5,
+        # Deterministic, so the same document always gets the same verdict and repeats are served from cache
+        temperature=0.0
+    )
     
-    DEAL_MANAGEMENT_AGENT = {
-        "name": "deal_management_agent",
-        "description": "Orchestrates transaction workflows and deal management",
-        "system_prompt": """You are a deal management agent for Impact Realty AI. Your role encompasses:
+    DEAL_MANAGEMENT_AGENT = AgentSpec(
+        name="deal_management_agent",
+        description="Orchestrates transaction workflows and deal management",
+        system_prompt="""You are a deal management agent for Impact Realty AI. Your role encompasses:
 1. Managing real estate transaction workflows
 2. Tracking deal milestones and deadlines
 3. Coordinating between buyers, sellers, and agents
@@ -175,15 +258,15 @@ Always prioritize accuracy and regulatory compliance. Flag any potential issues
 5. Providing deal status updates and reporting
 
 Focus on efficiency, accuracy, and timely execution of all deal-related tasks.""",
-        "tools": ["zoho_crm", "broker_sumo", "document_manager", "calendar"],
-        "max_iterations": 15,
-        "temperature": 0.5
-    }
+        tools=("zoho_crm", "broker_sumo", "document_manager", "calendar"),
+        max_iterations=15,
+        temperature=0.5
+    )
     
-    COMMUNICATION_AGENT = {
-        "name": "communication_agent",
-        "description": "Handles email, calendar, and CRM communications",
-        "system_prompt": """You are a communication agent for Impact Realty AI. Your responsibilities include:
+    COMMUNICATION_AGENT = AgentSpec(
+        name="communication_agent",
+        description="Handles email, calendar, and CRM communications",
+        system_prompt="""You are a communication agent for Impact Realty AI. Your responsibilities include:
 1. Managing email communications with clients and agents
 2. Scheduling and coordinating calendar events
 3. Updating CRM records with communication history
@@ -191,15 +274,15 @@ Focus on efficiency, accuracy, and timely execution of all deal-related tasks.""
 5. Maintaining professional communication standards
 
 Always maintain a professional, friendly, and helpful tone in all communications.""",
-        "tools": ["gmail", "google_calendar", "zoho_crm", "email_templates"],
-        "max_iterations": 8,
-        "temperature": 0.6
-    }
+        tools=("gmail", "google_calendar", "zoho_crm", "email_templates"),
+        max_iterations=8,
+        temperature=0.6
+    )
     
-    ANALYTICS_AGENT = {
-        "name": "analytics_agent",
-        "description": "Provides performance metrics and business insights",
-        "system_prompt": """You are an analytics agent for Impact Realty AI. Your role includes:
+    ANALYTICS_AGENT = AgentSpec(
+        name="analytics_agent",
+        description="Provides performance metrics and business insights",
+        system_prompt="""You are an analytics agent for Impact Realty AI. Your role includes:
 1. Analyzing business performance metrics
 2. Generating reports and dashboards
 3. Identifying trends and opportunities
@@ -207,10 +290,10 @@ Always maintain a professional, friendly, and helpful tone in all communications
 5. Monitoring KPIs and goal progress
 
 Focus on accuracy, clarity, and actionable insights in all analysis and reporting.""",
-        "tools": ["supabase", "zoho_crm", "report_generator", "data_analyzer"],
-        "max_iterations": 12,
-        "temperature": 0.4
-    }
+        tools=("supabase", "zoho_crm", "report_generator", "data_analyzer"),
+        max_iterations=12,
+        temperature=0.4
+    )
 
 
 # MCP Configuration
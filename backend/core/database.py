@@ -3,18 +3,142 @@ Database connection and initialization for Supabase
 """
 
 import asyncio
+import functools
+import random
+import asyncpg
+import httpx
+import orjson
 from supabase import create_client, Client
-from typing import Optional, Dict, Any, List
+from postgrest.utils import SyncClient
+from typing import Optional, Dict, Any, List, AsyncIterator, Final, FrozenSet, Tuple
 import logging
-from datetime import datetime
-import json
+from datetime import datetime, timezone
 
 from .config import settings
+from .llm_cache import InMemoryLRU
+from .write_buffer import WriteBuffer
 
 logger = logging.getLogger(__name__)
 
-# Global Supabase client
+# Global Supabase clients
 _supabase_client: Optional[Client] = None
+_service_role_client: Optional[Client] = None
+
+# Connection pool shared by the PostgREST sessions of both clients
+_postgrest_transport: Optional[httpx.HTTPTransport] = None
+
+
+def get_postgrest_transport() -> httpx.HTTPTransport:
+    """Get the pooled transport used for PostgREST requests"""
+    global _postgrest_transport
+    
+    if _postgrest_transport is None:
+        _postgrest_transport = httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.DB_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DB_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=30
+            )
+        )
+        logger.info(
+            f"PostgREST connection pool: max_connections={settings.DB_HTTP_MAX_CONNECTIONS}, "
+            f"max_keepalive={settings.DB_HTTP_MAX_KEEPALIVE}"
+        )
+    
+    return _postgrest_transport
+
+
+class _OrjsonResponse(httpx.Response):
+    """Response whose JSON body is decoded with orjson"""
+    
+    def json(self, **kwargs: Any) -> Any:
+        return orjson.loads(self.content)
+
+
+class _OrjsonSession(SyncClient):
+    """PostgREST session that encodes request bodies and decodes responses with orjson"""
+    
+    def request(self, method: str, url: Any, *, json: Any = None, **kwargs: Any) -> httpx.Response:
+        if json is not None:
+            headers = httpx.Headers(kwargs.pop("headers", None))
+            headers["Content-Type"] = "application/json"
+            kwargs["headers"] = headers
+            kwargs["content"] = orjson.dumps(json, default=str)
+        response = super().request(method, url, **kwargs)
+        # postgrest parses every body through response.json()
+        response.__class__ = _OrjsonResponse
+        return response
+
+
+def _use_pooled_transport(client: Client) -> Client:
+    """Swap the client's PostgREST session for an orjson one on the shared connection pool"""
+    session = client.postgrest.session
+    client.postgrest.session = _OrjsonSession(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        transport=get_postgrest_transport()
+    )
+    session.close()
+    return client
+
+
+def _quote_ident(name: str) -> str:
+    """Quote a table or column name for interpolation into SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _row_json(columns: str) -> str:
+    """SQL expression rendering the selected columns of row r as JSONB, like a PostgREST select"""
+    if columns.strip() == "*":
+        return "to_jsonb(r)"
+    names = [name.strip() for name in columns.split(",")]
+    return "jsonb_build_object(" + ", ".join(
+        f"'{name.replace(chr(39), chr(39) * 2)}', r.{_quote_ident(name)}" for name in names
+    ) + ")"
+
+
+def _project(row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+    """Copy the selected columns out of a full row"""
+    if columns.strip() == "*":
+        return dict(row)
+    return {name: row.get(name) for name in (name.strip() for name in columns.split(","))}
+
+
+@functools.lru_cache(maxsize=256)
+def _list_records_sql(table: str, filter_keys: Tuple[str, ...], columns: str) -> str:
+    """Build the list_records statement once per table, filter set and column selection"""
+    target = _table_ident(table)
+    conditions = " AND ".join(
+        f"r.{_quote_ident(key)} = f.{_quote_ident(key)}" for key in filter_keys
+    ) or "TRUE"
+    # Filter values arrive as one JSONB row so Postgres casts each to its column type
+    return (
+        f"SELECT {_row_json(columns)} FROM {target} AS r, "
+        f"jsonb_populate_record(NULL::{target}, $1::jsonb) AS f "
+        f"WHERE {conditions} LIMIT $2 OFFSET $3"
+    )
+
+
+def _to_jsonb(data: Dict[str, Any]) -> str:
+    """Encode a row as a JSONB parameter"""
+    return orjson.dumps(data, default=str).decode()
+
+
+def _is_missing_function(error: Exception) -> bool:
+    """Whether a PostgREST error means the RPC function doesn't exist (schema not installed via exec_sql)"""
+    return getattr(error, "code", None) == "PGRST202"
+
+
+def close_db_clients():
+    """Close the pooled PostgREST connections"""
+    global _supabase_client, _service_role_client, _postgrest_transport
+    
+    if _postgrest_transport is not None:
+        _postgrest_transport.close()
+    _supabase_client = None
+    _service_role_client = None
+    _postgrest_transport = None
 
 
 def get_supabase_client() -> Client:
@@ -22,20 +146,25 @@ def get_supabase_client() -> Client:
     global _supabase_client
     
     if _supabase_client is None:
-        _supabase_client = create_client(
+        _supabase_client = _use_pooled_transport(create_client(
             settings.SUPABASE_URL,
             settings.SUPABASE_KEY
-        )
+        ))
     
     return _supabase_client
 
 
 def get_service_role_client() -> Client:
     """Get Supabase service role client for admin operations"""
-    return create_client(
-        settings.SUPABASE_URL,
-        settings.SUPABASE_SERVICE_ROLE_KEY
-    )
+    global _service_role_client
+    
+    if _service_role_client is None:
+        _service_role_client = _use_pooled_transport(create_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_ROLE_KEY
+        ))
+    
+    return _service_role_client
 
 
 async def init_db():
@@ -57,209 +186,312 @@ async def init_db():
         raise
 
 
+# Users table (extends Supabase auth.users)
+USERS_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS users (
+    id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    full_name VARCHAR(255),
+    role VARCHAR(50) DEFAULT 'user',
+    company_id UUID,
+    preferences JSONB DEFAULT '{}',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Companies table
+COMPANIES_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS companies (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(255) NOT NULL,
+    industry VARCHAR(100) DEFAULT 'real_estate',
+    settings JSONB DEFAULT '{}',
+    subscription_plan VARCHAR(50) DEFAULT 'basic',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Agents table
+AGENTS_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS agents (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(255) NOT NULL,
+    type VARCHAR(100) NOT NULL,
+    description TEXT,
+    system_prompt TEXT,
+    config JSONB DEFAULT '{}',
+    status VARCHAR(50) DEFAULT 'active',
+    company_id UUID REFERENCES companies(id),
+    created_by UUID REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Workflows table
+WORKFLOWS_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS workflows (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    type VARCHAR(100) NOT NULL,
+    config JSONB DEFAULT '{}',
+    status VARCHAR(50) DEFAULT 'active',
+    company_id UUID REFERENCES companies(id),
+    created_by UUID REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Workflow executions table
+WORKFLOW_EXECUTIONS_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS workflow_executions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    workflow_id UUID REFERENCES workflows(id),
+    status VARCHAR(50) DEFAULT 'running',
+    input_data JSONB,
+    output_data JSONB,
+    steps JSONB DEFAULT '[]',
+    error_message TEXT,
+    started_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    completed_at TIMESTAMP WITH TIME ZONE,
+    executed_by UUID REFERENCES users(id)
+);
+"""
+
+# Agent executions table
+AGENT_EXECUTIONS_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS agent_executions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    agent_id UUID REFERENCES agents(id),
+    workflow_execution_id UUID REFERENCES workflow_executions(id),
+    status VARCHAR(50) DEFAULT 'running',
+    input_data JSONB,
+    output_data JSONB,
+    metadata JSONB DEFAULT '{}',
+    error_message TEXT,
+    started_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+"""
+
+# Integrations table
+INTEGRATIONS_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS integrations (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(255) NOT NULL,
+    type VARCHAR(100) NOT NULL,
+    config JSONB DEFAULT '{}',
+    credentials JSONB DEFAULT '{}',
+    status VARCHAR(50) DEFAULT 'active',
+    company_id UUID REFERENCES companies(id),
+    created_by UUID REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Candidates table (for recruiting agent)
+CANDIDATES_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    first_name VARCHAR(255) NOT NULL,
+    last_name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    phone VARCHAR(50),
+    status VARCHAR(50) DEFAULT 'new',
+    source VARCHAR(100),
+    experience_years INTEGER,
+    current_company VARCHAR(255),
+    notes TEXT,
+    resume_url TEXT,
+    metadata JSONB DEFAULT '{}',
+    company_id UUID REFERENCES companies(id),
+    created_by UUID REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Deals table
+DEALS_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS deals (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    title VARCHAR(255) NOT NULL,
+    type VARCHAR(50) NOT NULL, -- 'buy', 'sell', 'rent'
+    status VARCHAR(50) DEFAULT 'active',
+    value DECIMAL(15,2),
+    commission DECIMAL(15,2),
+    property_address TEXT,
+    client_name VARCHAR(255),
+    client_email VARCHAR(255),
+    client_phone VARCHAR(50),
+    agent_id UUID REFERENCES users(id),
+    milestones JSONB DEFAULT '[]',
+    documents JSONB DEFAULT '[]',
+    metadata JSONB DEFAULT '{}',
+    company_id UUID REFERENCES companies(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    closing_date DATE
+);
+"""
+
+# Audit log table
+AUDIT_LOG_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS audit_log (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    entity_type VARCHAR(100) NOT NULL,
+    entity_id UUID NOT NULL,
+    action VARCHAR(100) NOT NULL,
+    old_values JSONB,
+    new_values JSONB,
+    user_id UUID REFERENCES users(id),
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Health check table
+HEALTH_CHECK_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS health_check (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    status VARCHAR(50) DEFAULT 'healthy',
+    checked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+# Candidate pipeline aggregation filters and groups on these columns
+CANDIDATES_INDEXES: Final[str] = """
+CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates(status);
+CREATE INDEX IF NOT EXISTS idx_candidates_source ON candidates(source);
+"""
+
+# Server-side GROUP BY exposed through PostgREST RPC (see DatabaseManager.aggregate)
+COUNT_BY_COLUMN_FUNCTION: Final[str] = """
+CREATE OR REPLACE FUNCTION count_by_column(table_name TEXT, column_name TEXT)
+RETURNS TABLE(value TEXT, count BIGINT)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    RETURN QUERY EXECUTE format(
+        'SELECT %I::TEXT, COUNT(*) FROM %I GROUP BY 1',
+        column_name, table_name
+    );
+END;
+$$;
+"""
+
+# Multi-row candidate status update behind the recruiting write-behind buffer
+BULK_UPDATE_CANDIDATE_STATUS_FUNCTION: Final[str] = """
+CREATE OR REPLACE FUNCTION bulk_update_candidate_status(updates JSONB)
+RETURNS VOID
+LANGUAGE sql AS $$
+    UPDATE candidates AS c
+    SET status = u.status, notes = u.notes, updated_at = NOW()
+    FROM jsonb_to_recordset(updates)
+        AS u(id UUID, status VARCHAR(50), notes TEXT)
+    WHERE c.id = u.id;
+$$;
+"""
+
+# Same statement issued directly on the asyncpg pool
+BULK_UPDATE_CANDIDATE_STATUS_SQL: Final[str] = """
+UPDATE candidates AS c
+SET status = u.status, notes = u.notes, updated_at = NOW()
+FROM jsonb_to_recordset($1::jsonb)
+    AS u(id UUID, status VARCHAR(50), notes TEXT)
+WHERE c.id = u.id
+"""
+
+# Stamp updated_at server-side on every UPDATE, whichever client issues it
+SET_UPDATED_AT_FUNCTION: Final[str] = """
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$;
+"""
+
+# Tables with an updated_at column. update_record stamps it too, since the trigger
+# only exists where the optional exec_sql RPC created the schema
+UPDATED_AT_TABLES: Final[FrozenSet[str]] = frozenset(
+    ("users", "companies", "agents", "workflows", "integrations", "candidates", "deals")
+)
+
+UPDATED_AT_TRIGGERS: Final[str] = "".join(
+    f"CREATE OR REPLACE TRIGGER {table}_set_updated_at BEFORE UPDATE ON {table} "
+    f"FOR EACH ROW EXECUTE FUNCTION set_updated_at();\n"
+    for table in sorted(UPDATED_AT_TABLES)
+)
+
+SCHEMA_OBJECTS: Final[Tuple[Tuple[str, str], ...]] = (
+    ("users", USERS_TABLE),
+    ("companies", COMPANIES_TABLE),
+    ("agents", AGENTS_TABLE),
+    ("workflows", WORKFLOWS_TABLE),
+    ("workflow_executions", WORKFLOW_EXECUTIONS_TABLE),
+    ("agent_executions", AGENT_EXECUTIONS_TABLE),
+    ("integrations", INTEGRATIONS_TABLE),
+    ("candidates", CANDIDATES_TABLE),
+    ("deals", DEALS_TABLE),
+    ("audit_log", AUDIT_LOG_TABLE),
+    ("health_check", HEALTH_CHECK_TABLE),
+    ("candidates_indexes", CANDIDATES_INDEXES),
+    ("count_by_column", COUNT_BY_COLUMN_FUNCTION),
+    ("bulk_update_candidate_status", BULK_UPDATE_CANDIDATE_STATUS_FUNCTION),
+    ("set_updated_at", SET_UPDATED_AT_FUNCTION),
+    ("updated_at_triggers", UPDATED_AT_TRIGGERS)
+)
+
+# Every statement is idempotent, so the whole schema goes over in one round-trip
+SCHEMA_SQL: Final[str] = "\n".join(sql for _, sql in SCHEMA_OBJECTS)
+
+# Lookup indexes for hot filter columns. CONCURRENTLY keeps writers unblocked while an index
+# builds on a populated table, but can't run inside a transaction, so these are sent one by
+# one over the Postgres pool rather than as part of SCHEMA_SQL. UNIQUE columns are already indexed.
+INDEX_STATEMENTS: Final[Tuple[str, ...]] = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_log_entity ON audit_log(entity_type, entity_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_agent_executions_agent_id ON agent_executions(agent_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_agent_executions_workflow_execution_id "
+    "ON agent_executions(workflow_execution_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_workflow_executions_workflow_id ON workflow_executions(workflow_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_deals_agent_id ON deals(agent_id)"
+)
+
+# Tables DatabaseManager may address, with their SQL identifiers quoted once up front
+TABLE_IDENTIFIERS: Final[Dict[str, str]] = {
+    table: _quote_ident(table)
+    for table in (
+        "users", "companies", "agents", "workflows", "workflow_executions", "agent_executions",
+        "integrations", "candidates", "deals", "audit_log", "health_check"
+    )
+}
+
+
+def _table_ident(table: str) -> str:
+    """Get a table's quoted identifier, rejecting tables outside the schema"""
+    try:
+        return TABLE_IDENTIFIERS[table]
+    except KeyError:
+        raise ValueError(f"Unknown table: {table}") from None
+
+
 async def create_tables(supabase: Client):
     """Create necessary database tables"""
-    
-    # Users table (extends Supabase auth.users)
-    users_table = """
-    CREATE TABLE IF NOT EXISTS users (
-        id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
-        email VARCHAR(255) UNIQUE NOT NULL,
-        full_name VARCHAR(255),
-        role VARCHAR(50) DEFAULT 'user',
-        company_id UUID,
-        preferences JSONB DEFAULT '{}',
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    # Companies table
-    companies_table = """
-    CREATE TABLE IF NOT EXISTS companies (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        name VARCHAR(255) NOT NULL,
-        industry VARCHAR(100) DEFAULT 'real_estate',
-        settings JSONB DEFAULT '{}',
-        subscription_plan VARCHAR(50) DEFAULT 'basic',
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    # Agents table
-    agents_table = """
-    CREATE TABLE IF NOT EXISTS agents (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        name VARCHAR(255) NOT NULL,
-        type VARCHAR(100) NOT NULL,
-        description TEXT,
-        system_prompt TEXT,
-        config JSONB DEFAULT '{}',
-        status VARCHAR(50) DEFAULT 'active',
-        company_id UUID REFERENCES companies(id),
-        created_by UUID REFERENCES users(id),
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    # Workflows table
-    workflows_table = """
-    CREATE TABLE IF NOT EXISTS workflows (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        name VARCHAR(255) NOT NULL,
-        description TEXT,
-        type VARCHAR(100) NOT NULL,
-        config JSONB DEFAULT '{}',
-        status VARCHAR(50) DEFAULT 'active',
-        company_id UUID REFERENCES companies(id),
-        created_by UUID REFERENCES users(id),
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    # Workflow executions table
-    workflow_executions_table = """
-    CREATE TABLE IF NOT EXISTS workflow_executions (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        workflow_id UUID REFERENCES workflows(id),
-        status VARCHAR(50) DEFAULT 'running',
-        input_data JSONB,
-        output_data JSONB,
-        steps JSONB DEFAULT '[]',
-        error_message TEXT,
-        started_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        completed_at TIMESTAMP WITH TIME ZONE,
-        executed_by UUID REFERENCES users(id)
-    );
-    """
-    
-    # Agent executions table
-    agent_executions_table = """
-    CREATE TABLE IF NOT EXISTS agent_executions (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        agent_id UUID REFERENCES agents(id),
-        workflow_execution_id UUID REFERENCES workflow_executions(id),
-        status VARCHAR(50) DEFAULT 'running',
-        input_data JSONB,
-        output_data JSONB,
-        metadata JSONB DEFAULT '{}',
-        error_message TEXT,
-        started_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        completed_at TIMESTAMP WITH TIME ZONE
-    );
-    """
-    
-    # Integrations table
-    integrations_table = """
-    CREATE TABLE IF NOT EXISTS integrations (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        name VARCHAR(255) NOT NULL,
-        type VARCHAR(100) NOT NULL,
-        config JSONB DEFAULT '{}',
-        credentials JSONB DEFAULT '{}',
-        status VARCHAR(50) DEFAULT 'active',
-        company_id UUID REFERENCES companies(id),
-        created_by UUID REFERENCES users(id),
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    # Candidates table (for recruiting agent)
-    candidates_table = """
-    CREATE TABLE IF NOT EXISTS candidates (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        first_name VARCHAR(255) NOT NULL,
-        last_name VARCHAR(255) NOT NULL,
-        email VARCHAR(255) UNIQUE NOT NULL,
-        phone VARCHAR(50),
-        status VARCHAR(50) DEFAULT 'new',
-        source VARCHAR(100),
-        experience_years INTEGER,
-        current_company VARCHAR(255),
-        notes TEXT,
-        resume_url TEXT,
-        metadata JSONB DEFAULT '{}',
-        company_id UUID REFERENCES companies(id),
-        created_by UUID REFERENCES users(id),
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    # Deals table
-    deals_table = """
-    CREATE TABLE IF NOT EXISTS deals (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        title VARCHAR(255) NOT NULL,
-        type VARCHAR(50) NOT NULL, -- 'buy', 'sell', 'rent'
-        status VARCHAR(50) DEFAULT 'active',
-        value DECIMAL(15,2),
-        commission DECIMAL(15,2),
-        property_address TEXT,
-        client_name VARCHAR(255),
-        client_email VARCHAR(255),
-        client_phone VARCHAR(50),
-        agent_id UUID REFERENCES users(id),
-        milestones JSONB DEFAULT '[]',
-        documents JSONB DEFAULT '[]',
-        metadata JSONB DEFAULT '{}',
-        company_id UUID REFERENCES companies(id),
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-        closing_date DATE
-    );
-    """
-    
-    # Audit log table
-    audit_log_table = """
-    CREATE TABLE IF NOT EXISTS audit_log (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        entity_type VARCHAR(100) NOT NULL,
-        entity_id UUID NOT NULL,
-        action VARCHAR(100) NOT NULL,
-        old_values JSONB,
-        new_values JSONB,
-        user_id UUID REFERENCES users(id),
-        ip_address INET,
-        user_agent TEXT,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    # Health check table
-    health_check_table = """
-    CREATE TABLE IF NOT EXISTS health_check (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        status VARCHAR(50) DEFAULT 'healthy',
-        checked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-    """
-    
-    tables = [
-        ("users", users_table),
-        ("companies", companies_table),
-        ("agents", agents_table),
-        ("workflows", workflows_table),
-        ("workflow_executions", workflow_executions_table),
-        ("agent_executions", agent_executions_table),
-        ("integrations", integrations_table),
-        ("candidates", candidates_table),
-        ("deals", deals_table),
-        ("audit_log", audit_log_table),
-        ("health_check", health_check_table)
-    ]
-    
-    for table_name, table_sql in tables:
-        try:
-            # Note: Supabase doesn't have direct SQL execution in Python client
-            # This would typically be done through the Supabase dashboard or migrations
-            logger.info(f"Table schema defined for {table_name}")
-        except Exception as e:
-            logger.error(f"Failed to create table {table_name}: {e}")
+    try:
+        # Supabase has no direct SQL execution in the Python client; this relies on an
+        # exec_sql(query TEXT) function installed through the dashboard or migrations
+        supabase.rpc("exec_sql", {"query": SCHEMA_SQL}).execute()
+        logger.info(f"Database schema applied for {len(SCHEMA_OBJECTS)} objects")
+    except Exception as e:
+        logger.warning(f"Schema not applied via exec_sql, apply it through migrations: {e}")
 
 
 async def create_initial_data(supabase: Client):
@@ -329,60 +561,319 @@ async def create_initial_data(supabase: Client):
         logger.error(f"Failed to create initial data: {e}")
 
 
+# Failures where the request never reached the database, so any operation can be retried
+_NOT_SENT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+    ConnectionRefusedError,
+    asyncpg.exceptions.CannotConnectNowError,
+    asyncpg.exceptions.TooManyConnectionsError
+)
+
+# Connections dropped mid-request; only safe to retry for idempotent operations
+_CONNECTION_LOST_ERRORS = (
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
+    ConnectionResetError,
+    asyncpg.exceptions.ConnectionDoesNotExistError
+)
+
+
+def retry_db_operation(idempotent: bool = True):
+    """Retry a DatabaseManager operation on transient connection errors with jittered exponential backoff"""
+    retryable = _NOT_SENT_ERRORS + _CONNECTION_LOST_ERRORS if idempotent else _NOT_SENT_ERRORS
+    
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            attempts = max(1, settings.DB_RETRY_ATTEMPTS)
+            for attempt in range(1, attempts + 1):
+                try:
+                    return await func(self, *args, **kwargs)
+                except retryable as e:
+                    if attempt == attempts:
+                        raise
+                    await self._reset_connections(e)
+                    # Full jitter keeps concurrent retries from hitting the database in lockstep
+                    delay = random.uniform(0, settings.DB_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                    logger.warning(
+                        f"{func.__name__} failed with {type(e).__name__}, "
+                        f"retrying in {delay:.3f}s (attempt {attempt}/{attempts})"
+                    )
+                    await asyncio.sleep(delay)
+        return wrapper
+    
+    return decorator
+
+
 class DatabaseManager:
     """Database manager for common operations"""
     
+    # Batches at least this large go through COPY instead of a multi-row INSERT
+    COPY_THRESHOLD = 100
+    
     def __init__(self):
-        self.supabase = get_supabase_client()
-        self.service_client = get_service_role_client()
+        # Supabase clients are created on first use, not when this module is imported
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._pg_pool: Optional[asyncpg.Pool] = None
+        # Audit events are coalesced into multi-row inserts off the request path
+        self.audit_events = WriteBuffer(
+            self.bulk_log_audit_events,
+            "audit log",
+            max_batch=100,
+            flush_interval=0.025
+        )
+        # Short-lived cache of full rows for read-heavy, write-rare tables
+        self._read_cache = InMemoryLRU(max_size=settings.DB_READ_CACHE_MAX_SIZE)
+        # Bumped by every cached-row invalidation; a read that overlapped one doesn't cache its row
+        self._read_cache_generation = 0
+        # Set once PostgREST reports an optional RPC missing, so later calls go straight to the fallback
+        self._candidate_status_rpc_missing = False
+        self._count_rpc_missing = False
+    
+    @property
+    def supabase(self) -> Client:
+        """Supabase client for regular operations"""
+        return get_supabase_client()
+    
+    @property
+    def service_client(self) -> Client:
+        """Supabase service role client for admin operations"""
+        return get_service_role_client()
     
+    async def open_pool(self):
+        """Open the direct Postgres pool used by the CRUD helpers when SUPABASE_DB_URL is set"""
+        if self._pg_pool is not None or not settings.SUPABASE_DB_URL:
+            return
+        
+        try:
+            self._pg_pool = await asyncpg.create_pool(
+                settings.SUPABASE_DB_URL,
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                max_inactive_connection_lifetime=1800,
+                timeout=30,
+                command_timeout=30,
+                # Supavisor can hand a session a different backend, so prepared statements can't be cached
+                statement_cache_size=0
+            )
+            logger.info(
+                f"Postgres pool opened: min_size={settings.DB_POOL_MIN_SIZE}, "
+                f"max_size={settings.DB_POOL_MAX_SIZE}"
+            )
+        except Exception as e:
+            logger.warning(f"Postgres pool unavailable, using PostgREST: {e}")
+    
+    async def close_pool(self):
+        """Close the direct Postgres pool"""
+        if self._pg_pool is None:
+            return
+        await self._pg_pool.close()
+        self._pg_pool = None
+    
+    async def create_indexes(self):
+        """Build the lookup indexes without blocking writes, one statement at a time"""
+        if self._pg_pool is None:
+            logger.info("No Postgres pool; create lookup indexes through migrations")
+            return
+        
+        for statement in INDEX_STATEMENTS:
+            try:
+                await self._pg_pool.execute(statement)
+            except Exception as e:
+                logger.warning(f"Failed to create index ({statement}): {e}")
+    
+    async def _reset_connections(self, error: Exception):
+        """Replace pooled Postgres connections after a connection-level failure"""
+        # httpx discards broken sockets itself; asyncpg connections are recycled on next acquire
+        if self._pg_pool is not None and not isinstance(error, httpx.HTTPError):
+            await self._pg_pool.expire_connections()
+    
+    async def ping(self) -> bool:
+        """Run a trivial query to check the database is reachable"""
+        try:
+            if self._pg_pool is not None:
+                await self._pg_pool.fetchval("SELECT 1")
+            self.supabase.table("health_check").select("id").limit(1).execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Database ping failed: {e}")
+            return False
+    
+    async def warm_up(self):
+        """Open the HTTP connections to PostgREST before the first request needs them"""
+        try:
+            self.supabase.table("health_check").select("id").limit(1).execute()
+            self.service_client.table("health_check").select("id").limit(1).execute()
+            logger.info("Database connections warmed up")
+        except Exception as e:
+            logger.warning(f"Database warm-up failed: {e}")
+    
+    def start_keepalive(self, interval: int):
+        """Ping periodically so pooled keep-alive connections don't idle out"""
+        if interval <= 0 or self._keepalive_task is not None:
+            return
+        self._keepalive_task = asyncio.create_task(self._keepalive(interval))
+    
+    async def _keepalive(self, interval: int):
+        """Background loop behind start_keepalive"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.ping()
+    
+    async def stop_keepalive(self):
+        """Stop the keep-alive loop"""
+        if self._keepalive_task is None:
+            return
+        self._keepalive_task.cancel()
+        try:
+            await self._keepalive_task
+        except asyncio.CancelledError:
+            pass
+        self._keepalive_task = None
+    
+    @retry_db_operation(idempotent=False)
     async def create_record(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new record"""
+        target = _table_ident(table)
         try:
+            if self._pg_pool is not None:
+                # Values are cast to the column types server-side, as PostgREST does
+                columns = ", ".join(_quote_ident(column) for column in data)
+                row = await self._pg_pool.fetchval(
+                    f"INSERT INTO {target} ({columns}) "
+                    f"SELECT {columns} FROM jsonb_populate_record(NULL::{target}, $1::jsonb) "
+                    f"RETURNING to_jsonb({target})",
+                    _to_jsonb(data)
+                )
+                return orjson.loads(row) if row else None
+            
             result = self.supabase.table(table).insert(data).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to create record in {table}: {e}")
             raise
     
-    async def get_record(self, table: str, record_id: str) -> Optional[Dict[str, Any]]:
-        """Get a record by ID"""
+    @retry_db_operation()
+    async def get_record(self, table: str, record_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        """Get a record by ID, fetching only the given columns"""
+        target = _table_ident(table)
+        cache_key = f"{table}:{record_id}"
+        if settings.DB_READ_CACHE_TTL > 0:
+            cached = await self._read_cache.get(cache_key)
+            if cached is not None:
+                return _project(cached, columns)
+        generation = self._read_cache_generation
+        
         try:
-            result = self.supabase.table(table).select("*").eq("id", record_id).execute()
-            return result.data[0] if result.data else None
+            if self._pg_pool is not None:
+                row = await self._pg_pool.fetchval(
+                    f"SELECT {_row_json(columns)} FROM {target} AS r WHERE r.id = $1",
+                    record_id
+                )
+                record = orjson.loads(row) if row else None
+            else:
+                result = self.supabase.table(table).select(columns).eq("id", record_id).execute()
+                record = result.data[0] if result.data else None
+            
+            # Only full rows are cached, so any column selection can be served from them.
+            # A write that invalidated rows while this read was in flight may have made it stale
+            if (
+                record is not None
+                and columns.strip() == "*"
+                and settings.DB_READ_CACHE_TTL > 0
+                and generation == self._read_cache_generation
+            ):
+                await self._read_cache.set(cache_key, record, settings.DB_READ_CACHE_TTL)
+                return dict(record)
+            return record
         except Exception as e:
             logger.error(f"Failed to get record from {table}: {e}")
             raise
     
+    @retry_db_operation()
     async def update_record(self, table: str, record_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a record"""
+        target = _table_ident(table)
+        stamp_updated_at = table in UPDATED_AT_TABLES
         try:
-            data["updated_at"] = datetime.now().isoformat()
+            if self._pg_pool is not None:
+                assignments = [
+                    f"{_quote_ident(column)} = f.{_quote_ident(column)}"
+                    for column in data
+                    if not (stamp_updated_at and column == "updated_at")
+                ]
+                if stamp_updated_at:
+                    assignments.append("updated_at = NOW()")
+                row = await self._pg_pool.fetchval(
+                    f"UPDATE {target} AS r SET {', '.join(assignments)} "
+                    f"FROM jsonb_populate_record(NULL::{target}, $1::jsonb) AS f "
+                    f"WHERE r.id = $2 RETURNING to_jsonb(r)",
+                    _to_jsonb(data),
+                    record_id
+                )
+                return orjson.loads(row) if row else None
+            
+            if stamp_updated_at:
+                data = {**data, "updated_at": datetime.now(timezone.utc).isoformat()}
             result = self.supabase.table(table).update(data).eq("id", record_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to update record in {table}: {e}")
             raise
+        finally:
+            await self._invalidate_cached_row(table, record_id)
+    
+    async def _invalidate_cached_row(self, table: str, record_id: str):
+        """Drop a row from the read cache after a write, and keep in-flight reads from re-caching it"""
+        self._read_cache_generation += 1
+        await self._read_cache.delete(f"{table}:{record_id}")
     
+    @retry_db_operation()
     async def delete_record(self, table: str, record_id: str) -> bool:
         """Delete a record"""
+        target = _table_ident(table)
         try:
+            if self._pg_pool is not None:
+                # The returned id doubles as the success flag
+                deleted_id = await self._pg_pool.fetchval(
+                    f"DELETE FROM {target} WHERE id = $1 RETURNING id",
+                    record_id
+                )
+                return deleted_id is not None
+            
             result = self.supabase.table(table).delete().eq("id", record_id).execute()
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Failed to delete record from {table}: {e}")
             raise
+        finally:
+            await self._invalidate_cached_row(table, record_id)
     
+    @retry_db_operation()
     async def list_records(
         self, 
         table: str, 
         filters: Optional[Dict[str, Any]] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        columns: str = "*"
     ) -> List[Dict[str, Any]]:
-        """List records with optional filtering"""
+        """List records with optional filtering, fetching only the given columns"""
+        _table_ident(table)
         try:
-            query = self.supabase.table(table).select("*")
+            if self._pg_pool is not None:
+                filters = filters or {}
+                rows = await self._pg_pool.fetch(
+                    _list_records_sql(table, tuple(sorted(filters)), columns),
+                    _to_jsonb(filters),
+                    limit,
+                    offset
+                )
+                return [orjson.loads(row[0]) for row in rows]
+            
+            query = self.supabase.table(table).select(columns)
             
             if filters:
                 for key, value in filters.items():
@@ -394,6 +885,169 @@ class DatabaseManager:
             logger.error(f"Failed to list records from {table}: {e}")
             raise
     
+    async def iter_records(
+        self,
+        table: str,
+        *,
+        order_by: str,
+        desc: bool = False,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield records page by page so memory stays bounded by page_size"""
+        _table_ident(table)
+        offset = 0
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            try:
+                query = self.supabase.table(table).select(columns)
+                
+                if filters:
+                    for key, value in filters.items():
+                        query = query.eq(key, value)
+                
+                result = query.order(order_by, desc=desc).range(offset, offset + size - 1).execute()
+            except Exception as e:
+                logger.error(f"Failed to iterate records from {table}: {e}")
+                raise
+            
+            for row in result.data:
+                yield row
+            
+            if len(result.data) < size:
+                break
+            offset += size
+            if remaining is not None:
+                remaining -= size
+    
+    async def count_records(self, table: str, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Count records server-side without transferring rows"""
+        _table_ident(table)
+        try:
+            query = self.supabase.table(table).select("id", count="exact")
+            
+            if filters:
+                for key, value in filters.items():
+                    query = query.eq(key, value)
+            
+            result = query.limit(1).execute()
+            return result.count or 0
+        except Exception as e:
+            logger.error(f"Failed to count records in {table}: {e}")
+            raise
+    
+    async def aggregate(self, table: str, group_by: str) -> Dict[str, int]:
+        """Count records per distinct value of a column with a server-side GROUP BY"""
+        target = _table_ident(table)
+        try:
+            if self._pg_pool is not None:
+                rows = await self._pg_pool.fetch(
+                    f"SELECT {_quote_ident(group_by)}::TEXT AS value, COUNT(*) AS count FROM {target} GROUP BY 1"
+                )
+            elif not self._count_rpc_missing:
+                rows = self.supabase.rpc(
+                    "count_by_column",
+                    {"table_name": table, "column_name": group_by}
+                ).execute().data
+            else:
+                return await self._aggregate_client_side(table, group_by)
+            
+            return {
+                (row["value"] if row["value"] is not None else "unknown"): row["count"]
+                for row in rows
+            }
+        except Exception as e:
+            if self._pg_pool is None and _is_missing_function(e):
+                # count_by_column only exists where exec_sql installed the schema
+                logger.warning(f"count_by_column RPC missing, counting {table} by {group_by} client-side")
+                self._count_rpc_missing = True
+                return await self._aggregate_client_side(table, group_by)
+            logger.error(f"Failed to aggregate {table} by {group_by}: {e}")
+            raise
+    
+    async def _aggregate_client_side(self, table: str, group_by: str) -> Dict[str, int]:
+        """Count records per value of a column by paging through just that column"""
+        counts: Dict[str, int] = {}
+        async for record in self.iter_records(table, order_by="id", columns=f"id, {group_by}"):
+            value = record.get(group_by)
+            key = str(value) if value is not None else "unknown"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    
+    async def bulk_update_candidate_status(self, updates: List[Dict[str, Any]]):
+        """Apply several candidate status updates in one statement"""
+        if not updates:
+            return
+        
+        # A candidate updated twice in one batch keeps only its latest update
+        latest = list({update["id"]: update for update in updates}.values())
+        try:
+            if self._pg_pool is not None:
+                await self._pg_pool.execute(BULK_UPDATE_CANDIDATE_STATUS_SQL, orjson.dumps(latest).decode())
+            elif not self._candidate_status_rpc_missing:
+                self.supabase.rpc("bulk_update_candidate_status", {"updates": latest}).execute()
+            else:
+                await self._update_candidates_individually(latest)
+        except Exception as e:
+            if self._pg_pool is not None or isinstance(e, _NOT_SENT_ERRORS + _CONNECTION_LOST_ERRORS):
+                logger.error(f"Failed to bulk update {len(updates)} candidates: {e}")
+                raise
+            
+            # The RPC only exists where exec_sql installed the schema; don't lose the batch without it
+            if _is_missing_function(e):
+                self._candidate_status_rpc_missing = True
+            logger.warning(f"Bulk candidate update RPC failed ({e}), updating {len(latest)} candidates one by one")
+            await self._update_candidates_individually(latest)
+        finally:
+            for update in updates:
+                await self._invalidate_cached_row("candidates", update["id"])
+    
+    async def _update_candidates_individually(self, updates: List[Dict[str, Any]]):
+        """Apply candidate status updates one row at a time, logging the ones that fail"""
+        for update in updates:
+            try:
+                await self.update_record("candidates", update["id"], {"status": update["status"], "notes": update["notes"]})
+            except Exception as e:
+                logger.error(f"Failed to update candidate {update['id']} status: {e}")
+    
+    async def bulk_insert(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        """Insert many rows at once, using binary COPY for large batches on the Postgres pool"""
+        target = _table_ident(table)
+        if not rows:
+            return 0
+        
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        try:
+            if self._pg_pool is not None and len(rows) >= self.COPY_THRESHOLD:
+                # COPY skips server-side casts: values must already be Python types matching
+                # the columns (datetimes for timestamps); dicts and lists are sent as JSON text
+                records = [
+                    tuple(
+                        orjson.dumps(value).decode() if isinstance(value, (dict, list)) else value
+                        for value in (row.get(column) for column in columns)
+                    )
+                    for row in rows
+                ]
+                async with self._pg_pool.acquire() as conn:
+                    await conn.copy_records_to_table(table, records=records, columns=columns)
+            elif self._pg_pool is not None:
+                column_list = ", ".join(_quote_ident(column) for column in columns)
+                await self._pg_pool.execute(
+                    f"INSERT INTO {target} ({column_list}) "
+                    f"SELECT {column_list} FROM jsonb_populate_recordset(NULL::{target}, $1::jsonb)",
+                    orjson.dumps(rows, default=str).decode()
+                )
+            else:
+                self.supabase.table(table).insert(rows).execute()
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Failed to bulk insert {len(rows)} records into {table}: {e}")
+            raise
+    
     async def log_audit_event(
         self,
         entity_type: str,
@@ -404,20 +1058,54 @@ class DatabaseManager:
         new_values: Optional[Dict[str, Any]] = None
     ):
         """Log an audit event"""
+        await self.audit_events.put({
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "action": action,
+            "user_id": user_id,
+            "old_values": old_values,
+            "new_values": new_values
+        })
+    
+    async def bulk_log_audit_events(self, events: List[Dict[str, Any]]):
+        """Log several audit events with a single multi-row insert"""
+        if not events:
+            return
+        
         try:
-            audit_data = {
-                "entity_type": entity_type,
-                "entity_id": entity_id,
-                "action": action,
-                "user_id": user_id,
-                "old_values": old_values,
-                "new_values": new_values,
-                "created_at": datetime.now().isoformat()
-            }
+            # created_at comes from the column's DEFAULT NOW()
+            audit_rows = [
+                {
+                    "entity_type": event["entity_type"],
+                    "entity_id": event["entity_id"],
+                    "action": event["action"],
+                    "user_id": event.get("user_id"),
+                    "old_values": event.get("old_values"),
+                    "new_values": event.get("new_values")
+                }
+                for event in events
+            ]
             
-            await self.create_record("audit_log", audit_data)
+            await self.bulk_insert("audit_log", audit_rows)
         except Exception as e:
-            logger.error(f"Failed to log audit event: {e}")
+            logger.error(f"Failed to bulk log {len(events)} audit events: {e}")
+            # One bad row (e.g. a non-UUID entity_id) fails the whole insert; salvage the rest row by row.
+            # Not after connection errors: the database is unreachable, or the batch may have committed
+            if len(audit_rows) > 1 and not isinstance(e, _NOT_SENT_ERRORS + _CONNECTION_LOST_ERRORS):
+                await self._log_audit_rows_individually(audit_rows)
+    
+    async def _log_audit_rows_individually(self, audit_rows: List[Dict[str, Any]]):
+        """Insert audit rows one at a time, logging and skipping the ones that fail"""
+        failed = 0
+        for row in audit_rows:
+            try:
+                await self.bulk_insert("audit_log", [row])
+            except Exception as e:
+                failed += 1
+                logger.error(f"Dropped {row['action']} audit event for {row['entity_type']} {row['entity_id']!r}: {e}")
+        
+        if failed < len(audit_rows):
+            logger.info(f"Recovered {len(audit_rows) - failed} of {len(audit_rows)} audit events from a failed batch")
 
 
 # Global database manager instance
@@ -0,0 +1,44 @@
+"""
+Shared HTTP connection pool for third-party integrations
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+# One keep-alive pool for every integration's API traffic (Zoho, Broker Sumo, Google, ...)
+_integration_client: Optional[httpx.AsyncClient] = None
+
+
+def get_integration_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client used for integration API calls"""
+    global _integration_client
+    
+    if _integration_client is None or _integration_client.is_closed:
+        # HTTP/2 lets concurrent calls to one API host share a single TLS connection; hosts without it negotiate HTTP/1.1
+        _integration_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(connect=5.0, read=20.0, write=10.0, pool=5.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=300)
+        )
+    
+    return _integration_client
+
+
+def get_http(request: Request) -> httpx.AsyncClient:
+    """FastAPI dependency returning the integration client published on app.state"""
+    return request.app.state.http
+
+
+async def close_integration_clients():
+    """Close the shared integration HTTP pool"""
+    global _integration_client
+    
+    if _integration_client is not None:
+        await _integration_client.aclose()
+        _integration_client = None
+        logger.info("Shared integration HTTP client closed")
@@ -0,0 +1,229 @@
+"""
+Response caching for deterministic LLM calls
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage interface used by LLMCache"""
+    
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+    
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        ...
+
+
+class InMemoryLRU:
+    """Process-local LRU cache with per-entry expiry"""
+    
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _LeaderCancelled(Exception):
+    """Set on an in-flight future whose computing caller was cancelled"""
+
+
+class LLMCache:
+    """Content-hash cache that short-circuits repeated LLM invocations"""
+    
+    def __init__(self, backend: CacheBackend, ttl: int = 86400, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # Misses currently being computed; identical concurrent requests await the same future
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    @staticmethod
+    def cache_key(model: str, temperature: float, messages: Sequence[Any]) -> str:
+        """Derive a stable key from the model, sampling temperature and prompt messages"""
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(repr(temperature).encode("utf-8"))
+        for message in messages:
+            digest.update(b"\x00")
+            digest.update(getattr(message, "type", "").encode("utf-8"))
+            digest.update(b"\x01")
+            digest.update(str(getattr(message, "content", message)).encode("utf-8"))
+        return digest.hexdigest()
+    
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        if not self.enabled:
+            return await compute()
+        
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logger.error(f"LLM cache lookup failed: {e}")
+            cached = None
+        
+        if cached is not None:
+            self.hits += 1
+            return cached
+        
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                # The leader's caller went away; take over the computation or join whoever did
+                continue
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            # Not cancel(): that would cancel the waiters too, rather than letting them retry
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody else was waiting on isn't reported twice
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        
+        future.set_result(value)
+        
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.error(f"LLM cache store failed: {e}")
+        
+        return value
+    
+    def get_stats(self) -> dict:
+        """Get cache hit/miss counters"""
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced
+        }
+
+
+class SemanticLLMCache:
+    """Embedding-similarity cache that serves near-duplicate prompts from earlier responses"""
+    
+    def __init__(self, embeddings: Any, threshold: float = 0.97, max_size: int = 1000):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_size = max_size
+        self._vectors: dict = {}
+        self._values: dict = {}
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed text as a unit vector so inner product equals cosine similarity"""
+        vector = np.asarray(await self.embeddings.aembed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def lookup(self, namespace: str, vector: np.ndarray) -> Optional[Any]:
+        """Return the closest cached value in namespace if it clears the similarity threshold"""
+        matrix = self._vectors.get(namespace)
+        if matrix is None or not len(matrix):
+            self.misses += 1
+            return None
+        
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            self.hits += 1
+            return self._values[namespace][best]
+        
+        self.misses += 1
+        return None
+    
+    async def store(self, namespace: str, vector: np.ndarray, value: Any) -> None:
+        """Add a response to the namespace index, evicting the oldest entry when full"""
+        async with self._lock:
+            matrix = self._vectors.get(namespace)
+            values = self._values.setdefault(namespace, [])
+            
+            if matrix is None:
+                matrix = vector[np.newaxis, :]
+            else:
+                matrix = np.vstack([matrix, vector])
+            values.append(value)
+            
+            if len(values) > self.max_size:
+                matrix = matrix[1:]
+                del values[0]
+            
+            self._vectors[namespace] = matrix
+    
+    async def get_or_compute(self, namespace: str, text: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve a semantically equivalent cached response or compute and index a new one"""
+        try:
+            vector = await self.embed(text)
+        except Exception as e:
+            logger.error(f"Semantic cache embedding failed: {e}")
+            return await compute()
+        
+        cached = self.lookup(namespace, vector)
+        if cached is not None:
+            return cached
+        
+        value = await compute()
+        await self.store(namespace, vector, value)
+        return value
+    
+    def get_stats(self) -> dict:
+        """Get cache hit/miss counters"""
+        return {
+            "entries": sum(len(values) for values in self._values.values()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,67 @@
+"""
+Shared LLM clients and HTTP connection pool for all agents
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# One connection pool for every agent's OpenAI traffic
+_shared_http_client: Optional[httpx.AsyncClient] = None
+
+# ChatOpenAI instances keyed by (temperature, latency_optimized)
+_llm_clients: Dict[Tuple[float, bool], ChatOpenAI] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client used for LLM provider calls"""
+    global _shared_http_client
+    
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=30)
+        )
+    
+    return _shared_http_client
+
+
+def get_llm(temperature: float, latency_optimized: bool = False) -> ChatOpenAI:
+    """Get the shared ChatOpenAI client for a temperature"""
+    key = (temperature, latency_optimized)
+    llm = _llm_clients.get(key)
+    
+    if llm is None:
+        model_kwargs = {}
+        if latency_optimized and settings.LLM_LATENCY_SERVICE_TIER:
+            # Provider-side fast path; applies to every call made through this client.
+            # Sent as a raw body field because the pinned openai SDK has no service_tier argument
+            model_kwargs["extra_body"] = {"service_tier": settings.LLM_LATENCY_SERVICE_TIER}
+        
+        llm = ChatOpenAI(
+            model=settings.DEFAULT_LLM_MODEL,
+            temperature=temperature,
+            api_key=settings.OPENAI_API_KEY,
+            http_async_client=get_http_client(),
+            model_kwargs=model_kwargs
+        )
+        _llm_clients[key] = llm
+    
+    return llm
+
+
+async def close_llm_clients():
+    """Close the shared HTTP pool and drop cached LLM clients"""
+    global _shared_http_client
+    
+    _llm_clients.clear()
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
+        logger.info("Shared LLM HTTP client closed")
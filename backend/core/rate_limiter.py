@@ -0,0 +1,38 @@
+"""
+Client-side rate limiting for third-party APIs with request quotas
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds, with server-requested pauses"""
+    
+    def __init__(self, rate: int, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+    
+    def pause(self, seconds: float):
+        """Hold every caller for the given time, e.g. to honor a Retry-After header"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
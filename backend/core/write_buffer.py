@@ -0,0 +1,83 @@
+"""
+Write-behind buffer that batches database writes off the request path
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    """Queue writes and flush them in batches from a background task"""
+    
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], Awaitable[None]],
+        name: str,
+        max_batch: int = 128,
+        flush_interval: float = 0.05,
+        max_size: int = 1000
+    ):
+        self._flush = flush
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the background flusher"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._task = asyncio.create_task(self._run())
+    
+    async def put(self, item: Any):
+        """Queue a write, writing it inline if the buffer isn't running or is full"""
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except asyncio.QueueFull:
+                logger.warning(f"{self.name} write buffer full, writing inline")
+        
+        try:
+            await self._flush([item])
+        except Exception as e:
+            logger.error(f"Failed to write {self.name} item: {e}")
+    
+    async def flush(self):
+        """Wait until every queued write has been flushed"""
+        if self._queue is not None:
+            await self._queue.join()
+    
+    async def stop(self):
+        """Flush pending writes and stop the background flusher"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._queue = None
+        self._task = None
+    
+    async def _run(self):
+        """Drain the queue, handing batches of up to max_batch items to the flush callable"""
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Linger briefly so concurrent writers share one flush
+            with suppress(asyncio.TimeoutError):
+                while len(batch) < self.max_batch:
+                    batch.append(await asyncio.wait_for(self._queue.get(), self.flush_interval))
+            
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} {self.name} writes: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
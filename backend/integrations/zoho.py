@@ -4,28 +4,194 @@ Zoho CRM Integration using MCP (Model Context Protocol)
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import random
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Tuple, Union
 import httpx
-import json
-from datetime import datetime, timedelta
+import orjson
+from datetime import datetime
 
 from core.config import settings, MCPConfig
+from core.database import db_manager
+from core.http_pool import get_integration_client
+from core.llm_cache import InMemoryLRU
+from core.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Zoho quotas are per organization, so every integration instance shares the same budget
+_request_slots = asyncio.Semaphore(settings.ZOHO_MAX_CONCURRENCY)
+_rate_limiter = RateLimiter(settings.ZOHO_REQUESTS_PER_MINUTE, period=60.0)
+
+# Exact-match cache for GET responses. Keys carry a per-module generation that
+# writes bump, so a write to a module orphans its cached reads until they expire.
+_get_cache = InMemoryLRU(max_size=settings.ZOHO_GET_CACHE_MAX_SIZE)
+_module_generations: Dict[str, int] = {}
+
+# Filter value type -> (operator, value) criteria term
+_CRITERIA_TERMS: Dict[type, Callable[[Any], Tuple[str, Any]]] = {
+    str: lambda value: ("equals", value),
+    dict: lambda value: (value.get("operator", "equals"), value.get("value")),
+}
+
+
+@lru_cache(maxsize=1024)
+def _criteria_string(terms: Tuple[Tuple[str, Tuple[str, Any]], ...]) -> str:
+    """Join (field, (operator, value)) terms into a Zoho criteria string"""
+    return " and ".join(
+        f"({field}:{operator}:{value})"
+        for field, (operator, value) in terms
+        if value is not None
+    )
+
+
+# Mock-mode GET payloads per module, built once at import
+_MOCK_GET_RESPONSES: Dict[str, Dict[str, Any]] = {
+    "contacts": {
+        "data": [
+            {
+                "id": "mock_contact_1",
+                "First_Name": "John",
+                "Last_Name": "Doe",
+                "Email": "john.doe@email.com",
+                "Phone": "(555) 123-4567",
+                "Lead_Source": "Website",
+                "Created_Time": "2024-01-01T10:00:00Z"
+            },
+            {
+                "id": "mock_contact_2",
+                "First_Name": "Jane",
+                "Last_Name": "Smith",
+                "Email": "jane.smith@email.com",
+                "Phone": "(555) 234-5678",
+                "Lead_Source": "Referral",
+                "Created_Time": "2024-01-02T11:00:00Z"
+            }
+        ],
+        "info": {
+            "count": 2,
+            "more_records": False
+        }
+    },
+    "deals": {
+        "data": [
+            {
+                "id": "mock_deal_1",
+                "Deal_Name": "123 Main St Sale",
+                "Amount": 450000,
+                "Stage": "Negotiation/Review",
+                "Contact_Name": {"name": "John Doe", "id": "mock_contact_1"},
+                "Closing_Date": "2024-02-15",
+                "Created_Time": "2024-01-01T10:00:00Z"
+            }
+        ],
+        "info": {
+            "count": 1,
+            "more_records": False
+        }
+    },
+    "leads": {
+        "data": [
+            {
+                "id": "mock_lead_1",
+                "First_Name": "Sarah",
+                "Last_Name": "Johnson",
+                "Email": "sarah.johnson@email.com",
+                "Phone": "(555) 345-6789",
+                "Lead_Status": "Not Contacted",
+                "Lead_Source": "Advertisement",
+                "Created_Time": "2024-01-03T09:00:00Z"
+            }
+        ],
+        "info": {
+            "count": 1,
+            "more_records": False
+        }
+    }
+}
+
+# Internal field -> Zoho field, per module
+_CONTACT_FIELD_MAP: Tuple[Tuple[str, str], ...] = (
+    ("first_name", "First_Name"),
+    ("last_name", "Last_Name"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("company", "Account_Name"),
+    ("title", "Title"),
+    ("source", "Lead_Source"),
+    ("notes", "Description")
+)
+
+_DEAL_FIELD_MAP: Tuple[Tuple[str, str], ...] = (
+    ("name", "Deal_Name"),
+    ("amount", "Amount"),
+    ("stage", "Stage"),
+    ("closing_date", "Closing_Date"),
+    ("contact_id", "Contact_Name"),
+    ("description", "Description"),
+    ("probability", "Probability")
+)
+
+_LEAD_FIELD_MAP: Tuple[Tuple[str, str], ...] = (
+    ("first_name", "First_Name"),
+    ("last_name", "Last_Name"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("company", "Company"),
+    ("source", "Lead_Source"),
+    ("status", "Lead_Status"),
+    ("notes", "Description")
+)
+
 
 class ZohoIntegration:
     """
     Zoho CRM integration using MCP protocol for real estate operations
     """
     
-    def __init__(self):
+    # Zoho's insert records API accepts at most 100 records per call
+    MAX_RECORDS_PER_REQUEST = 100
+    
+    # Bulk inserts at least this large encode their request bodies in a worker thread
+    THREADED_ENCODE_THRESHOLD = 1000
+    
+    # Search page size (Zoho's maximum), how many pages a search sweeps at most,
+    # and how many follow-up pages are fetched at once
+    SEARCH_PAGE_SIZE = 200
+    MAX_SEARCH_PAGES = 5
+    SEARCH_PAGE_CONCURRENCY = 4
+    
+    # Retry backoff bounds in seconds
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    
+    # integrations row holding the access token shared across workers and restarts
+    TOKEN_CACHE_NAME = "zoho_crm"
+    TOKEN_CACHE_TYPE = "oauth_token_cache"
+    
+    # Supported HTTP methods -> whether the request carries a JSON body
+    _SENDS_BODY = {"GET": False, "POST": True, "PUT": True, "DELETE": False}
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.config = MCPConfig.ZOHO_MCP
         self.base_url = self.config["base_url"]
         self.access_token = None
-        self.token_expires_at = None
-        self.client = None
+        # Epoch expiry for reporting; refresh decisions use the monotonic deadline, which ignores clock changes
+        self.token_expires_at: Optional[float] = None
+        self._token_deadline = 0.0
+        # Pooled client shared with other integrations unless one is injected
+        self.client = client
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            # httpx decompresses both transparently; search pages shrink several-fold on the wire
+            "Accept-Encoding": "br, gzip"
+        }
         self.is_initialized = False
+        self._token_cache_id: Optional[str] = None
+        # Serializes token refreshes so concurrent requests share one
+        self._token_lock = asyncio.Lock()
     
     async def initialize(self):
         """Initialize Zoho integration"""
@@ -37,17 +203,11 @@ class ZohoIntegration:
                 self.is_initialized = True
                 return
             
-            # Initialize HTTP client
-            self.client = httpx.AsyncClient(
-                timeout=30.0,
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/json"
-                }
-            )
+            if self.client is None:
+                self.client = get_integration_client()
             
-            # Get access token
-            await self._refresh_access_token()
+            # Get access token, reusing one another worker already obtained
+            await self._ensure_valid_token()
             
             self.is_initialized = True
             logger.info("Zoho CRM integration initialized successfully")
@@ -76,14 +236,10 @@ class ZohoIntegration:
             response.raise_for_status()
             
             token_data = response.json()
-            self.access_token = token_data.get("access_token")
             expires_in = token_data.get("expires_in", 3600)
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 300)  # 5 min buffer
-            
-            # Update client headers
-            self.client.headers.update({
-                "Authorization": f"Zoho-oauthtoken {self.access_token}"
-            })
+            expires_at = time.time() + expires_in - 300  # 5 min buffer
+            self._set_access_token(token_data.get("access_token"), expires_at)
+            await self._store_shared_token(expires_at)
             
             logger.info("Zoho access token refreshed successfully")
             
@@ -91,132 +247,191 @@ class ZohoIntegration:
             logger.error(f"Failed to refresh Zoho access token: {e}")
             raise
     
+    def _set_access_token(self, access_token: Optional[str], expires_at: float):
+        """Adopt an access token expiring at the given epoch time"""
+        self.access_token = access_token
+        self.token_expires_at = expires_at
+        self._token_deadline = time.monotonic() + (expires_at - time.time())
+        
+        # Auth travels per request; the pooled client is shared with other integrations.
+        # Swapped rather than mutated so requests already holding the old dict are untouched
+        self.headers = {**self.headers, "Authorization": f"Zoho-oauthtoken {self.access_token}"}
+    
+    async def _load_shared_token(self) -> bool:
+        """Adopt an unexpired token cached by another worker or an earlier process"""
+        try:
+            rows = await db_manager.list_records(
+                "integrations",
+                filters={"name": self.TOKEN_CACHE_NAME, "type": self.TOKEN_CACHE_TYPE},
+                limit=1,
+                columns="id, credentials"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read cached Zoho token: {e}")
+            return False
+        
+        if not rows:
+            return False
+        
+        self._token_cache_id = rows[0]["id"]
+        cached = rows[0].get("credentials") or {}
+        if not cached.get("access_token") or cached.get("expires_at", 0) <= time.time():
+            return False
+        
+        self._set_access_token(cached["access_token"], cached["expires_at"])
+        logger.info("Reusing cached Zoho access token")
+        return True
+    
+    async def _store_shared_token(self, expires_at: float):
+        """Cache the current token for other workers and restarts"""
+        credentials = {"access_token": self.access_token, "expires_at": expires_at}
+        try:
+            if self._token_cache_id:
+                await db_manager.update_record("integrations", self._token_cache_id, {"credentials": credentials})
+            else:
+                row = await db_manager.create_record("integrations", {
+                    "name": self.TOKEN_CACHE_NAME,
+                    "type": self.TOKEN_CACHE_TYPE,
+                    "credentials": credentials
+                })
+                self._token_cache_id = row["id"] if row else None
+        except Exception as e:
+            logger.warning(f"Failed to cache Zoho token: {e}")
+    
+    def _token_expired(self) -> bool:
+        """Check whether the access token is missing or past its refresh point"""
+        return not self.access_token or time.monotonic() >= self._token_deadline
+    
     async def _ensure_valid_token(self):
-        """Ensure we have a valid access token"""
-        if not self.access_token or (self.token_expires_at and datetime.now() >= self.token_expires_at):
-            await self._refresh_access_token()
+        """Ensure we have a valid access token, refreshing it at most once across concurrent callers"""
+        if not self._token_expired():
+            return
+        
+        async with self._token_lock:
+            # Another caller may have refreshed while this one waited
+            if self._token_expired() and not await self._load_shared_token():
+                await self._refresh_access_token()
     
-    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Union[Dict, bytes]] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Make authenticated request to Zoho API"""
         if settings.is_mock_mode():
             return self._mock_response(method, endpoint, data, params)
         
+        method = method.upper()
+        module = endpoint.split("/", 1)[0].lower()
+        cache_key = None
+        if method == "GET" and settings.ZOHO_GET_CACHE_TTL > 0:
+            cache_key = self._get_cache_key(module, endpoint, params)
+            cached = await _get_cache.get(cache_key)
+            if cached is not None:
+                # Raw bytes are cached and decoded per hit, so no caller can mutate another's records
+                return orjson.loads(cached) if cached else {}
+        
         try:
-            await self._ensure_valid_token()
-            
             url = f"{self.base_url}/{endpoint}"
-            
-            if method.upper() == "GET":
-                response = await self.client.get(url, params=params)
-            elif method.upper() == "POST":
-                response = await self.client.post(url, json=data, params=params)
-            elif method.upper() == "PUT":
-                response = await self.client.put(url, json=data, params=params)
-            elif method.upper() == "DELETE":
-                response = await self.client.delete(url, params=params)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json()
+            # A POST that failed server-side may still have created records, so only 429s are retried for it
+            idempotent = method != "POST"
+            attempts = max(1, settings.ZOHO_MAX_RETRIES + 1)
+            
+            for attempt in range(1, attempts + 1):
+                await self._ensure_valid_token()
+                
+                try:
+                    async with _request_slots:
+                        await _rate_limiter.acquire()
+                        response = await self._send(method, url, data, params)
+                    logger.debug(
+                        f"Zoho {method} {endpoint} -> {response.status_code} "
+                        f"({response.http_version}, {response.headers.get('content-encoding', 'identity')})"
+                    )
+                except httpx.TransportError as e:
+                    if not idempotent or attempt == attempts:
+                        raise
+                    delay = self._retry_delay(attempt)
+                    logger.warning(f"Zoho {method} {endpoint} failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                retryable = response.status_code == 429 or (idempotent and response.status_code >= 500)
+                if retryable and attempt < attempts:
+                    delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                    if response.status_code == 429:
+                        # Throttled: hold every Zoho caller, not just this one
+                        _rate_limiter.pause(delay)
+                    logger.warning(f"Zoho {method} {endpoint} returned {response.status_code}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                response.raise_for_status()
+                # Zoho answers 204 with an empty body when a query matches nothing
+                if cache_key is not None:
+                    await _get_cache.set(cache_key, response.content, settings.ZOHO_GET_CACHE_TTL)
+                return orjson.loads(response.content) if response.content else {}
             
         except Exception as e:
             logger.error(f"Zoho API request failed: {e}")
             raise
+        finally:
+            if method != "GET":
+                # Even a failed write may have landed, so drop the module's cached reads either way
+                _module_generations[module] = _module_generations.get(module, 0) + 1
+    
+    def _get_cache_key(self, module: str, endpoint: str, params: Optional[Dict]) -> str:
+        """Cache key for a GET, scoped to the module's current write generation"""
+        query = orjson.dumps(params, option=orjson.OPT_SORT_KEYS, default=str).decode() if params else ""
+        return f"{module}:{_module_generations.get(module, 0)}:{endpoint}?{query}"
+    
+    async def _send(self, method: str, url: str, data: Optional[Union[Dict, bytes]], params: Optional[Dict]) -> httpx.Response:
+        """Send one request to the Zoho API"""
+        sends_body = self._SENDS_BODY.get(method)
+        if sends_body is None:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        content = None
+        if sends_body:
+            # Bulk inserts may hand over a body that was already encoded off the event loop
+            content = data if isinstance(data, bytes) else orjson.dumps(data)
+        return await self.client.request(method, url, content=content, params=params, headers=self.headers)
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Backoff before the next attempt, preferring the server's Retry-After"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        # Full jitter spreads retries from concurrent callers
+        return random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** (attempt - 1)))
     
     def _mock_response(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Generate mock responses for testing"""
-        if "contacts" in endpoint.lower():
-            if method.upper() == "GET":
-                return {
-                    "data": [
-                        {
-                            "id": "mock_contact_1",
-                            "First_Name": "John",
-                            "Last_Name": "Doe",
-                            "Email": "john.doe@email.com",
-                            "Phone": "(555) 123-4567",
-                            "Lead_Source": "Website",
-                            "Created_Time": "2024-01-01T10:00:00Z"
-                        },
-                        {
-                            "id": "mock_contact_2",
-                            "First_Name": "Jane",
-                            "Last_Name": "Smith",
-                            "Email": "jane.smith@email.com",
-                            "Phone": "(555) 234-5678",
-                            "Lead_Source": "Referral",
-                            "Created_Time": "2024-01-02T11:00:00Z"
-                        }
-                    ],
-                    "info": {
-                        "count": 2,
-                        "more_records": False
-                    }
-                }
-            elif method.upper() == "POST":
-                return {
-                    "data": [
-                        {
-                            "code": "SUCCESS",
-                            "details": {
-                                "Modified_Time": datetime.now().isoformat(),
-                                "Modified_By": {"name": "API User"},
-                                "Created_Time": datetime.now().isoformat(),
-                                "id": f"mock_contact_{datetime.now().timestamp()}"
-                            },
-                            "message": "record added",
-                            "status": "success"
-                        }
-                    ]
-                }
+        module = endpoint.split("/", 1)[0].lower()
+        method = method.upper()
         
-        elif "deals" in endpoint.lower():
-            if method.upper() == "GET":
-                return {
-                    "data": [
-                        {
-                            "id": "mock_deal_1",
-                            "Deal_Name": "123 Main St Sale",
-                            "Amount": 450000,
-                            "Stage": "Negotiation/Review",
-                            "Contact_Name": {"name": "John Doe", "id": "mock_contact_1"},
-                            "Closing_Date": "2024-02-15",
-                            "Created_Time": "2024-01-01T10:00:00Z"
-                        }
-                    ],
-                    "info": {
-                        "count": 1,
-                        "more_records": False
-                    }
-                }
-        
-        elif "leads" in endpoint.lower():
-            if method.upper() == "GET":
-                return {
-                    "data": [
-                        {
-                            "id": "mock_lead_1",
-                            "First_Name": "Sarah",
-                            "Last_Name": "Johnson",
-                            "Email": "sarah.johnson@email.com",
-                            "Phone": "(555) 345-6789",
-                            "Lead_Status": "Not Contacted",
-                            "Lead_Source": "Advertisement",
-                            "Created_Time": "2024-01-03T09:00:00Z"
-                        }
-                    ],
-                    "info": {
-                        "count": 1,
-                        "more_records": False
+        if (module, method) == ("contacts", "POST"):
+            now = datetime.now()
+            timestamp = now.isoformat()
+            return {
+                "data": [
+                    {
+                        "code": "SUCCESS",
+                        "details": {
+                            "Modified_Time": timestamp,
+                            "Modified_By": {"name": "API User"},
+                            "Created_Time": timestamp,
+                            "id": f"mock_contact_{now.timestamp()}"
+                        },
+                        "message": "record added",
+                        "status": "success"
                     }
-                }
+                ]
+            }
         
-        # Default mock response
-        return {
-            "data": [],
-            "info": {"count": 0, "more_records": False}
-        }
+        response = _MOCK_GET_RESPONSES.get(module) if method == "GET" else None
+        if response is None:
+            return {"data": [], "info": {"count": 0, "more_records": False}}
+        # Fresh top-level containers so callers can't alter the shared fixtures
+        return {"data": list(response["data"]), "info": dict(response["info"])}
     
     # MCP Tool Implementations
     
@@ -355,101 +570,131 @@ class ZohoIntegration:
             logger.error(f"Failed to create lead: {e}")
             return None
     
+    async def create_contacts_bulk(self, contacts: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Create many contacts, up to MAX_RECORDS_PER_REQUEST per POST"""
+        return await self._create_records_bulk("Contacts", [self._map_contact_to_zoho(c) for c in contacts])
+    
+    async def create_leads_bulk(self, leads: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Create many leads, up to MAX_RECORDS_PER_REQUEST per POST"""
+        return await self._create_records_bulk("Leads", [self._map_lead_to_zoho(l) for l in leads])
+    
+    async def create_deals_bulk(self, deals: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Create many deals, up to MAX_RECORDS_PER_REQUEST per POST"""
+        return await self._create_records_bulk("Deals", [self._map_deal_to_zoho(d) for d in deals])
+    
+    async def _create_records_bulk(self, module: str, records: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Insert records with multi-record POSTs; returns each record's details, or None where it failed"""
+        results: List[Optional[Dict[str, Any]]] = []
+        chunks = [
+            records[start:start + self.MAX_RECORDS_PER_REQUEST]
+            for start in range(0, len(records), self.MAX_RECORDS_PER_REQUEST)
+        ]
+        
+        if len(records) >= self.THREADED_ENCODE_THRESHOLD:
+            # Encoding thousands of records in one go would stall every other coroutine on the loop
+            bodies = await asyncio.to_thread(lambda: [orjson.dumps({"data": chunk}) for chunk in chunks])
+        else:
+            bodies = [{"data": chunk} for chunk in chunks]
+        
+        for chunk, body in zip(chunks, bodies):
+            try:
+                response = await self._make_request("POST", module, data=body)
+                # Zoho answers with one entry per submitted record, in order
+                entries = response.get("data") or []
+                results.extend(
+                    entry["details"] if entry.get("code") == "SUCCESS" else None
+                    for entry in entries
+                )
+                results.extend([None] * (len(chunk) - len(entries)))
+            except Exception as e:
+                logger.error(f"Failed to bulk create {len(chunk)} {module}: {e}")
+                results.extend([None] * len(chunk))
+        
+        return results
+    
     async def search_records(self, module: str, search_criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search records in Zoho CRM"""
         try:
-            criteria = self._build_criteria(search_criteria)
-            params = {
-                "criteria": criteria,
-                "per_page": 200
-            }
-            
-            response = await self._make_request("GET", module, params=params)
-            return response.get("data", [])
+            return [record async for record in self.iter_records(module, search_criteria)]
             
         except Exception as e:
             logger.error(f"Failed to search records: {e}")
             return []
     
+    async def iter_records(self, module: str, search_criteria: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield matching records page by page, up to MAX_SEARCH_PAGES pages"""
+        params = {
+            "criteria": self._build_criteria(search_criteria),
+            "per_page": self.SEARCH_PAGE_SIZE
+        }
+        
+        response = await self._make_request("GET", module, params={**params, "page": 1})
+        for record in response.get("data", []):
+            yield record
+        more_records = response.get("info", {}).get("more_records", False)
+        
+        # Fetch the remaining pages a window at a time, yielding them in order
+        page = 2
+        while more_records and page <= self.MAX_SEARCH_PAGES:
+            window = range(page, min(page + self.SEARCH_PAGE_CONCURRENCY, self.MAX_SEARCH_PAGES + 1))
+            responses = await asyncio.gather(*(
+                self._make_request("GET", module, params={**params, "page": number}) for number in window
+            ))
+            
+            for response in responses:
+                for record in response.get("data", []):
+                    yield record
+                more_records = response.get("info", {}).get("more_records", False)
+                if not more_records:
+                    break
+            page = window.stop
+    
     # Helper methods for data mapping
     
     def _map_contact_to_zoho(self, contact_data: Dict[str, Any]) -> Dict[str, Any]:
         """Map internal contact data to Zoho format"""
-        zoho_contact = {}
-        
-        # Map common fields
-        field_mapping = {
-            "first_name": "First_Name",
-            "last_name": "Last_Name",
-            "email": "Email",
-            "phone": "Phone",
-            "company": "Account_Name",
-            "title": "Title",
-            "source": "Lead_Source",
-            "notes": "Description"
-        }
-        
-        for internal_field, zoho_field in field_mapping.items():
-            if internal_field in contact_data:
-                zoho_contact[zoho_field] = contact_data[internal_field]
-        
-        return zoho_contact
+        return {zoho_field: contact_data[field] for field, zoho_field in _CONTACT_FIELD_MAP if field in contact_data}
     
     def _map_deal_to_zoho(self, deal_data: Dict[str, Any]) -> Dict[str, Any]:
         """Map internal deal data to Zoho format"""
-        zoho_deal = {}
-        
-        field_mapping = {
-            "name": "Deal_Name",
-            "amount": "Amount",
-            "stage": "Stage",
-            "closing_date": "Closing_Date",
-            "contact_id": "Contact_Name",
-            "description": "Description",
-            "probability": "Probability"
-        }
-        
-        for internal_field, zoho_field in field_mapping.items():
-            if internal_field in deal_data:
-                zoho_deal[zoho_field] = deal_data[internal_field]
-        
-        return zoho_deal
+        return {zoho_field: deal_data[field] for field, zoho_field in _DEAL_FIELD_MAP if field in deal_data}
     
     def _map_lead_to_zoho(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
         """Map internal lead data to Zoho format"""
-        zoho_lead = {}
-        
-        field_mapping = {
-            "first_name": "First_Name",
-            "last_name": "Last_Name",
-            "email": "Email",
-            "phone": "Phone",
-            "company": "Company",
-            "source": "Lead_Source",
-            "status": "Lead_Status",
-            "notes": "Description"
-        }
-        
-        for internal_field, zoho_field in field_mapping.items():
-            if internal_field in lead_data:
-                zoho_lead[zoho_field] = lead_data[internal_field]
-        
-        return zoho_lead
+        return {zoho_field: lead_data[field] for field, zoho_field in _LEAD_FIELD_MAP if field in lead_data}
     
     def _build_criteria(self, filters: Dict[str, Any]) -> str:
         """Build Zoho search criteria from filters"""
-        criteria_parts = []
-        
+        terms = []
         for field, value in filters.items():
-            if isinstance(value, str):
-                criteria_parts.append(f"({field}:equals:{value})")
-            elif isinstance(value, dict):
-                operator = value.get("operator", "equals")
-                val = value.get("value")
-                if val is not None:
-                    criteria_parts.append(f"({field}:{operator}:{val})")
+            normalize = _CRITERIA_TERMS.get(type(value))
+            if normalize:
+                terms.append((field, normalize(value)))
         
-        return " and ".join(criteria_parts) if criteria_parts else ""
+        try:
+            return _criteria_string(tuple(terms))
+        except TypeError:
+            # Unhashable filter value; build without the cache
+            return _criteria_string.__wrapped__(tuple(terms))
+    
+    async def _collect_candidates(self, module: str, source: str, search_filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Format a module's matching records as candidates, returning [] if the search fails"""
+        try:
+            return [
+                {
+                    "id": record.get("id"),
+                    "name": f"{record.get('First_Name', '')} {record.get('Last_Name', '')}".strip(),
+                    "email": record.get("Email"),
+                    "phone": record.get("Phone"),
+                    "source": source,
+                    "zoho_id": record.get("id")
+                }
+                async for record in self.iter_records(module, search_filters)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Failed to search {module} for candidates: {e}")
+            return []
     
     async def get_status(self) -> Dict[str, Any]:
         """Get integration status"""
@@ -459,15 +704,14 @@ class ZohoIntegration:
             "initialized": self.is_initialized,
             "mock_mode": settings.is_mock_mode(),
             "token_valid": self.access_token is not None,
-            "token_expires_at": self.token_expires_at.isoformat() if self.token_expires_at else None
+            "token_expires_at": datetime.fromtimestamp(self.token_expires_at).isoformat() if self.token_expires_at else None
         }
     
     async def shutdown(self):
         """Shutdown integration and cleanup resources"""
         try:
-            if self.client:
-                await self.client.aclose()
-            
+            # The pooled client outlives this integration and is closed at app shutdown
+            self.client = None
             self.is_initialized = False
             logger.info("Zoho integration shutdown completed")
             
@@ -491,36 +735,12 @@ class ZohoIntegration:
             if requirements.get("location"):
                 search_filters["City"] = requirements["location"]
             
-            # Search contacts
-            contacts = await self.search_records("Contacts", search_filters)
-            
-            # Search leads
-            leads = await self.search_records("Leads", search_filters)
-            
-            # Combine and format results
-            candidates = []
-            
-            for contact in contacts:
-                candidates.append({
-                    "id": contact.get("id"),
-                    "name": f"{contact.get('First_Name', '')} {contact.get('Last_Name', '')}".strip(),
-                    "email": contact.get("Email"),
-                    "phone": contact.get("Phone"),
-                    "source": "contact",
-                    "zoho_id": contact.get("id")
-                })
-            
-            for lead in leads:
-                candidates.append({
-                    "id": lead.get("id"),
-                    "name": f"{lead.get('First_Name', '')} {lead.get('Last_Name', '')}".strip(),
-                    "email": lead.get("Email"),
-                    "phone": lead.get("Phone"),
-                    "source": "lead",
-                    "zoho_id": lead.get("id")
-                })
-            
-            return candidates
+            # Contacts and leads are independent searches, each formatted as its pages arrive
+            contacts, leads = await asyncio.gather(
+                self._collect_candidates("Contacts", "contact", search_filters),
+                self._collect_candidates("Leads", "lead", search_filters)
+            )
+            return contacts + leads
             
         except Exception as e:
             logger.error(f"Failed to search candidates: {e}")
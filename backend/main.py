@@ -3,16 +3,20 @@ Impact Realty AI - Main FastAPI Application
 Multi-Agent SaaS Platform for Real Estate Operations
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+import time
 from typing import Dict, Any
 
 from core.config import settings
-from core.database import init_db
+from core.database import init_db, db_manager, close_db_clients
+from core.llm_pool import close_llm_clients
+from core.http_pool import get_integration_client, close_integration_clients
 from core.logging_config import setup_logging
 from api.auth import auth_router
 from api.agents import agents_router
@@ -25,31 +29,42 @@ from agents.supervisor import SupervisorAgent
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Global supervisor agent instance
-supervisor_agent = None
+# Probes within this window of the last successful database ping skip the round trip
+HEALTH_CHECK_CACHE_SECONDS = 5.0
+_last_db_ok = float("-inf")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
-    global supervisor_agent
-    
     logger.info("Starting Impact Realty AI backend...")
     
-    # Initialize database
-    await init_db()
+    # Initialize database; the schema round-trip and the Postgres pool connect are independent
+    await asyncio.gather(init_db(), db_manager.open_pool())
+    await db_manager.create_indexes()
+    await db_manager.warm_up()
+    db_manager.start_keepalive(settings.DB_KEEPALIVE_INTERVAL)
+    db_manager.audit_events.start()
     logger.info("Database initialized")
     
-    # Initialize supervisor agent
-    supervisor_agent = SupervisorAgent()
-    await supervisor_agent.initialize()
+    # Build the shared integration client on the serving loop; integrations pick up the same instance
+    app.state.http = get_integration_client()
+    
+    # Initialize supervisor agent; handlers reach it through get_supervisor
+    app.state.supervisor = SupervisorAgent()
+    await app.state.supervisor.initialize()
     logger.info("Supervisor agent initialized")
     
     yield
     
     # Cleanup
-    if supervisor_agent:
-        await supervisor_agent.shutdown()
+    await app.state.supervisor.shutdown()
+    await db_manager.stop_keepalive()
+    await db_manager.audit_events.stop()
+    await db_manager.close_pool()
+    close_db_clients()
+    await close_llm_clients()
+    await close_integration_clients()
     logger.info("Impact Realty AI backend shutdown complete")
 
 
@@ -60,6 +75,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -85,6 +101,11 @@ app.include_router(integrations_router, prefix="/api/v1/integrations", tags=["in
 app.include_router(analytics_router, prefix="/api/v1/analytics", tags=["analytics"])
 
 
+def get_supervisor(request: Request) -> SupervisorAgent:
+    """Dependency to get the supervisor agent created at startup"""
+    return request.app.state.supervisor
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -96,19 +117,23 @@ async def root():
     }
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe; answers without touching the database"""
+    return {"status": "alive"}
+
+
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
     try:
         # Check database connectivity
-        from core.database import get_supabase_client
-        supabase = get_supabase_client()
-        
-        # Simple connectivity test
-        response = supabase.table("health_check").select("count", count="exact").execute()
+        if not await _database_reachable():
+            raise RuntimeError("database ping failed")
         
         # Check supervisor agent status
-        agent_status = "healthy" if supervisor_agent and supervisor_agent.is_healthy() else "unhealthy"
+        supervisor = getattr(request.app.state, "supervisor", None)
+        agent_status = "healthy" if supervisor and supervisor.is_healthy() else "unhealthy"
         
         return {
             "status": "healthy",
@@ -124,11 +149,25 @@ async def health_check():
         )
 
 
+async def _database_reachable() -> bool:
+    """Ping the database, reusing a successful result for HEALTH_CHECK_CACHE_SECONDS"""
+    global _last_db_ok
+    
+    now = time.monotonic()
+    if now - _last_db_ok < HEALTH_CHECK_CACHE_SECONDS:
+        return True
+    
+    reachable = await db_manager.ping()
+    if reachable:
+        _last_db_ok = now
+    return reachable
+
+
 @app.get("/api/v1/status")
-async def get_system_status():
+async def get_system_status(supervisor: SupervisorAgent = Depends(get_supervisor)):
     """Get detailed system status"""
     try:
-        agent_stats = await supervisor_agent.get_status() if supervisor_agent else {}
+        agent_stats = await supervisor.get_status()
         
         return {
             "system": {
@@ -156,16 +195,11 @@ async def get_system_status():
 @app.post("/api/v1/agents/execute")
 async def execute_agent_workflow(
     request: Dict[str, Any],
-    current_user: Dict = Depends(auth_router.get_current_user)
+    current_user: Dict = Depends(auth_router.get_current_user),
+    supervisor: SupervisorAgent = Depends(get_supervisor)
 ):
     """Execute an agent workflow"""
     try:
-        if not supervisor_agent:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Supervisor agent not available"
-            )
-        
         workflow_type = request.get("workflow_type")
         params = request.get("params", {})
         
@@ -174,7 +208,7 @@ async def execute_agent_workflow(
         params["user_email"] = current_user.get("email")
         
         # Execute workflow
-        result = await supervisor_agent.execute_workflow(workflow_type, params)
+        result = await supervisor.execute_workflow(workflow_type, params)
         
         return {
             "success": True,
@@ -193,16 +227,10 @@ async def execute_agent_workflow(
 
 
 @app.get("/api/v1/agents/{agent_type}/status")
-async def get_agent_status(agent_type: str):
+async def get_agent_status(agent_type: str, supervisor: SupervisorAgent = Depends(get_supervisor)):
     """Get status of a specific agent"""
     try:
-        if not supervisor_agent:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Supervisor agent not available"
-            )
-        
-        agent_status = await supervisor_agent.get_agent_status(agent_type)
+        agent_status = await supervisor.get_agent_status(agent_type)
         
         if not agent_status:
             raise HTTPException(
@@ -224,7 +252,7 @@ async def get_agent_status(agent_type: str):
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal server error",
@@ -234,16 +262,6 @@ async def global_exception_handler(request, exc):
     )
 
 
-def get_supervisor_agent():
-    """Dependency to get supervisor agent instance"""
-    if not supervisor_agent:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Supervisor agent not available"
-        )
-    return supervisor_agent
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(